@@ -3,11 +3,34 @@ import sys
 import numpy as np
 from phildb.database import PhilDB
 
+
+def autocorr(chunks):
+    """
+        Lag one autocorrelation of a series read in chunks, as
+        pandas.Series.autocorr, without holding the whole series in memory.
+    """
+    # Count and sums of x, y, x * x, y * y and x * y over the valid pairs.
+    sums = np.zeros(6)
+    previous = np.nan
+    for chunk in chunks:
+        values = np.concatenate(([previous], chunk.values))
+        x, y = values[1:], values[:-1]
+        valid = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[valid], y[valid]
+
+        sums += [len(x), x.sum(), y.sum(), (x * x).sum(), (y * y).sum(), (x * y).sum()]
+        previous = values[-1]
+
+    n, sx, sy, sxx, syy, sxy = sums
+
+    return (n * sxy - sx * sy) / np.sqrt((n * sxx - sx ** 2) * (n * syy - sy ** 2))
+
+
 db = PhilDB(sys.argv[1])
 
 ac = np.array(
     [
-        (hrs_id, db.read(hrs_id, "D", measurand="Q", source="BOM_HRS").autocorr())
+        (hrs_id, autocorr(db.iter_read(hrs_id, "D", measurand="Q", source="BOM_HRS")))
         for hrs_id in db.ts_list()
     ],
     dtype=[("name", "S8"), ("val", float)],
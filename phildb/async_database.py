@@ -0,0 +1,351 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+import functools
+import os
+import threading
+
+from phildb import reader
+from phildb import writer
+from phildb.database import PhilDB
+
+
+class FileLock(object):
+    """
+        Lock on a data file shared by the reads and writes of one event loop.
+
+        A write holds the lock alone and writes take it one at a time, in
+        the order they were made. Any number of reads can hold it together,
+        but a read waits for the writes made before it to finish and a
+        write waits for the reads holding the lock to finish.
+    """
+
+    def __init__(self):
+        # Operations holding or waiting for the lock.
+        self.users = 0
+
+        self.__write_lock = asyncio.Lock()
+        self.__readers = 0
+        self.__idle = asyncio.Event()
+        self.__idle.set()
+
+    async def acquire_read(self):
+        async with self.__write_lock:
+            self.__readers += 1
+            self.__idle.clear()
+
+    def release_read(self):
+        self.__readers -= 1
+        if self.__readers == 0:
+            self.__idle.set()
+
+    async def acquire_write(self):
+        await self.__write_lock.acquire()
+        try:
+            await self.__idle.wait()
+        except BaseException:
+            self.__write_lock.release()
+            raise
+
+    def release_write(self):
+        self.__write_lock.release()
+
+
+class AsyncPhilDB(object):
+    """
+        Asyncio interface to a PhilDB database.
+
+        Blocking file and SQLite work is run on a bounded thread pool so the
+        event loop is never blocked. Concurrent reads of the same timeseries
+        are coalesced into a single read of the file; callers awaiting the
+        same read are given the same result object, which should be treated
+        as read only.
+
+        Neither SQLite sessions nor PyTables are safe to share between
+        threads, so metadata lookups and HDF5 log access are serialised.
+        Reads and writes of different data files run concurrently, those of
+        the same data file are ordered by its FileLock so a read never sees
+        a partly written file.
+
+        Backpressure is applied with max_pending: once that many
+        operations are queued or running, further calls wait before being
+        submitted to the thread pool.
+    """
+
+    def __init__(self, tsdb_path, max_workers=None, max_pending=None):
+        """
+            :param tsdb_path: Path to the PhilDB database.
+            :type tsdb_path: string
+            :param max_workers: Number of threads used for blocking work.
+                (Optional, defaults to the ThreadPoolExecutor default)
+            :type max_workers: int
+            :param max_pending: Maximum number of operations queued or
+                running at once. (Optional, unbounded if None)
+            :type max_pending: int
+        """
+        self.db = PhilDB(tsdb_path)
+        self.max_pending = max_pending
+
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.__lock = threading.Lock()
+        self.__semaphore = None
+        self.__last_turn = None
+        self.__pending = 0
+        self.__reads = {}
+        self.__file_locks = {}
+
+    @property
+    def pending(self):
+        """
+            Number of operations currently queued or running.
+        """
+        return self.__pending
+
+    async def __run(self, func, *args, **kwargs):
+        """
+            Run func on the thread pool, waiting for a free slot if
+            max_pending operations are already outstanding.
+        """
+        if self.max_pending is not None and self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.max_pending)
+
+        self.__pending += 1
+        try:
+            if self.__semaphore is not None:
+                await self.__semaphore.acquire()
+
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self.__executor, functools.partial(func, *args, **kwargs)
+                )
+            finally:
+                if self.__semaphore is not None:
+                    self.__semaphore.release()
+        finally:
+            self.__pending -= 1
+
+    def __locked(self, func, *args, **kwargs):
+        with self.__lock:
+            return func(*args, **kwargs)
+
+    async def __coalesce(self, key, coroutine_function, *args, **kwargs):
+        """
+            Await coroutine_function, sharing the result with any concurrent
+            call made with the same key. coroutine_function is only called
+            when there isn't one.
+        """
+        future = self.__reads.get(key)
+        if future is None:
+            future = asyncio.ensure_future(coroutine_function(*args, **kwargs))
+            self.__reads[key] = future
+
+            def done(future):
+                if self.__reads.get(key) is future:
+                    del self.__reads[key]
+
+            future.add_done_callback(done)
+
+        return await asyncio.shield(future)
+
+    def __file_paths(self, identifiers, freq, **kwargs):
+        return [
+            self.db.get_file_path(identifier, freq, **kwargs)
+            for identifier in identifiers
+        ]
+
+    def __next_turn(self):
+        """
+            Take the next turn to queue for FileLocks.
+
+            Must be called before the operation first awaits anything, so
+            turns are taken in the order operations are made.
+
+            :returns: tuple -- (previous, turn) futures, turn is to be set
+                once this operation has queued for its locks.
+        """
+        previous = self.__last_turn
+        turn = self.__last_turn = asyncio.get_running_loop().create_future()
+
+        return previous, turn
+
+    @asynccontextmanager
+    async def __file_access(self, turn, write, identifiers, freq, **kwargs):
+        """
+            Hold the FileLock of the data file of each of identifiers, for
+            writing if write is True otherwise for reading.
+
+            The file paths are looked up concurrently but operations queue
+            for their locks in turn, so the reads and writes of a file are
+            applied in the order they were made, whatever attributes they
+            name the timeseries instance with. Locks are taken in path order.
+
+            :param turn: Result of __next_turn.
+            :type turn: tuple
+            :returns: list -- File path of each identifier.
+        """
+        previous, turn = turn
+        try:
+            file_paths = await self.__run(
+                self.__locked, self.__file_paths, identifiers, freq, **kwargs
+            )
+            if previous is not None:
+                await asyncio.shield(previous)
+        finally:
+            # The next operation can't run until this one yields, by which
+            # point this one has queued for its first lock.
+            if previous is None or previous.done():
+                turn.set_result(None)
+            else:
+                previous.add_done_callback(lambda future: turn.set_result(None))
+
+        file_locks = []
+        for file_path in sorted(set(file_paths)):
+            file_lock = self.__file_locks.get(file_path)
+            if file_lock is None:
+                file_lock = self.__file_locks[file_path] = FileLock()
+
+            file_lock.users += 1
+            file_locks.append((file_path, file_lock))
+
+        acquired = []
+        try:
+            for file_path, file_lock in file_locks:
+                if write:
+                    await file_lock.acquire_write()
+                else:
+                    await file_lock.acquire_read()
+                acquired.append(file_lock)
+
+            yield file_paths
+        finally:
+            for file_lock in acquired:
+                if write:
+                    file_lock.release_write()
+                else:
+                    file_lock.release_read()
+
+            # Drop the locks of files no other operation is waiting on.
+            for file_path, file_lock in file_locks:
+                file_lock.users -= 1
+                if file_lock.users == 0:
+                    del self.__file_locks[file_path]
+
+    def __read(self, identifier, freq, start, end, **kwargs):
+        # The turn is taken when the read is made, not when the returned
+        # coroutine starts running.
+        return self.__read_file(
+            self.__next_turn(), identifier, freq, start, end, **kwargs
+        )
+
+    async def __read_file(self, turn, identifier, freq, start, end, **kwargs):
+        async with self.__file_access(
+            turn, False, [identifier], freq, **kwargs
+        ) as paths:
+            return await self.__run(reader.read, paths[0], start, end, freq)
+
+    def __write_file(self, file_path, ts, freq):
+        log_file = os.path.splitext(file_path)[0] + ".hdf5"
+
+        modified = writer.write(file_path, ts, freq)
+        self.__locked(writer.write_log, log_file, modified, datetime.utcnow())
+
+        return modified
+
+    async def read(self, identifier, freq, start=None, end=None, **kwargs):
+        """
+            Read the timeseries record for the requested timeseries instance.
+
+            See PhilDB.read.
+
+            :returns: pandas.Series -- Timeseries data.
+        """
+        key = ("read", identifier, freq, start, end, tuple(sorted(kwargs.items())))
+
+        return await self.__coalesce(
+            key, self.__read, identifier, freq, start, end, **kwargs
+        )
+
+    async def read_dataframe(self, identifiers, freq, workers=None, **kwargs):
+        """
+            Read the entire timeseries record for the requested timeseries instances.
+
+            Only the file path lookups are serialised, the files are read
+            concurrently with other operations.
+
+            See PhilDB.read_dataframe.
+
+            :returns: pandas.DataFrame -- Timeseries data.
+        """
+        turn = self.__next_turn()
+        identifiers = list(identifiers)
+
+        async with self.__file_access(
+            turn, False, identifiers, freq, **kwargs
+        ) as paths:
+            return await self.__run(
+                reader.read_dataframe, paths, identifiers, freq, workers
+            )
+
+    async def read_log(
+        self, identifier, freq, as_at_datetime, start=None, end=None, **kwargs
+    ):
+        """
+            Read the timeseries as it was at as_at_datetime.
+
+            See PhilDB.read_log.
+
+            :returns: pandas.Series -- Timeseries data.
+        """
+        key = (
+            "read_log",
+            identifier,
+            freq,
+            as_at_datetime,
+            start,
+            end,
+            tuple(sorted(kwargs.items())),
+        )
+
+        return await self.__coalesce(
+            key,
+            self.__run,
+            self.__locked,
+            self.db.read_log,
+            identifier,
+            freq,
+            as_at_datetime,
+            start,
+            end,
+            **kwargs
+        )
+
+    async def write(self, identifier, freq, ts, **kwargs):
+        """
+            Write/update timeseries data for existing timeseries.
+
+            Writes to the same data file are applied one at a time in the
+            order they were made, and reads of it made after a write wait
+            for the write to finish. Reads started after a write is made
+            aren't coalesced with reads started before it.
+
+            See PhilDB.write.
+
+            :returns: dict -- Log entries of the write, as returned by writer.write.
+        """
+        turn = self.__next_turn()
+        for key in list(self.__reads):
+            if key[1:3] == (identifier, freq):
+                del self.__reads[key]
+
+        async with self.__file_access(
+            turn, True, [identifier], freq, **kwargs
+        ) as paths:
+            return await self.__run(self.__write_file, paths[0], ts, freq)
+
+    def close(self):
+        """
+            Shut down the thread pool, waiting for outstanding work to finish.
+        """
+        self.__executor.shutdown(wait=True)
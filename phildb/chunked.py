@@ -0,0 +1,385 @@
+"""
+    Compressed chunked data file format.
+
+    The file starts with a header identifying the format, followed by chunks
+    of up to chunk_records records. Each chunk has a fixed size header with
+    the number of records, first and last date and the sizes of three
+    separately encoded blocks:
+
+        * dates: a single delta when the dates are evenly spaced, otherwise
+          zlib compressed deltas.
+        * values: each value XORed with the previous value, byte shuffled
+          and zlib compressed. Missing values are stored as MISSING_VALUE
+          exactly as they are in the legacy format.
+        * meta IDs: run-length encoded.
+
+    All chunks except the last hold exactly chunk_records records so the
+    chunk containing a given record can be found from the chunk headers
+    alone, without decompressing anything.
+"""
+import os
+from struct import pack, unpack, calcsize
+import zlib
+
+import numpy as np
+
+# The magic can't be mistaken for the first date of a legacy format file,
+# as an int64 it is a date hundreds of millions of years in the future.
+magic = b"\x89PDB\r\n\x1a\n"
+format_version = 1
+header_format = "<8sHI"  # magic, format version, records per chunk
+header_size = calcsize(header_format)
+
+# Records, first date, last date, date encoding, then the sizes of the
+# encoded dates, values and meta IDs.
+chunk_header_format = "<IqqBIII"
+chunk_header_size = calcsize(chunk_header_format)
+
+default_chunk_records = 4096
+compression_level = 6
+copy_buffer_size = 16 * 1024 * 1024
+
+dates_regular = 0
+dates_delta = 1
+
+
+def is_chunked(filename):
+    """
+        Check if filename is a chunked format data file.
+
+        :param filename: Data file to check.
+        :type filename: string
+        :returns: bool -- True if the file is in the chunked format.
+    """
+    if not os.path.isfile(filename):
+        return False
+
+    with open(filename, "rb") as reader:
+        return reader.read(len(magic)) == magic
+
+
+def create(filename, chunk_records=default_chunk_records):
+    """
+        Create an empty chunked format data file.
+
+        :param filename: Data file to create.
+        :type filename: string
+        :param chunk_records: Number of records per chunk.
+        :type chunk_records: int
+    """
+    with open(filename, "wb") as writer:
+        writer.write(pack(header_format, magic, format_version, chunk_records))
+
+
+def __read_header(reader):
+    file_magic, version, chunk_records = unpack(header_format, reader.read(header_size))
+
+    if file_magic != magic:
+        raise IOError("Not a chunked format data file")
+
+    if version != format_version:
+        raise IOError("Unsupported chunked format version: {0}".format(version))
+
+    return chunk_records
+
+
+def read_index(filename):
+    """
+        Read the chunk headers of a chunked format data file.
+
+        :param filename: Data file to read.
+        :type filename: string
+        :returns: tuple -- (chunk_records, chunks) where chunks is a list of
+            (offset, records, first date, last date) of each chunk.
+    """
+    chunks = []
+    with open(filename, "rb") as reader:
+        chunk_records = __read_header(reader)
+
+        offset = header_size
+        while True:
+            header = reader.read(chunk_header_size)
+            if len(header) < chunk_header_size:
+                break
+
+            records, first, last, encoding, dates_size, values_size, meta_size = unpack(
+                chunk_header_format, header
+            )
+            chunks.append((offset, records, first, last))
+
+            offset += chunk_header_size + dates_size + values_size + meta_size
+            reader.seek(offset, os.SEEK_SET)
+
+    return chunk_records, chunks
+
+
+def __encode_chunk(dates, values, meta_ids):
+    """
+        Encode a chunk of records.
+
+        :returns: bytes -- Chunk header and encoded records.
+    """
+    deltas = np.diff(dates)
+    if len(deltas) == 0 or (deltas == deltas[0]).all():
+        encoding = dates_regular
+        encoded_dates = pack("<q", deltas[0] if len(deltas) > 0 else 0)
+    else:
+        encoding = dates_delta
+        encoded_dates = zlib.compress(deltas.astype("<i8").tobytes(), compression_level)
+
+    bits = np.ascontiguousarray(values, dtype="<f8").view("<u8")
+    xored = bits ^ np.concatenate((np.zeros(1, dtype="<u8"), bits[:-1]))
+    shuffled = xored.view(np.uint8).reshape(len(bits), 8).T
+    encoded_values = zlib.compress(shuffled.tobytes(), compression_level)
+
+    starts = np.concatenate(([0], np.flatnonzero(meta_ids[1:] != meta_ids[:-1]) + 1))
+    run_lengths = np.diff(np.concatenate((starts, [len(meta_ids)])))
+    encoded_meta_ids = (
+        np.asarray(meta_ids)[starts].astype("<i4").tobytes()
+        + run_lengths.astype("<u4").tobytes()
+    )
+
+    header = pack(
+        chunk_header_format,
+        len(dates),
+        dates[0],
+        dates[-1],
+        encoding,
+        len(encoded_dates),
+        len(encoded_values),
+        len(encoded_meta_ids),
+    )
+
+    return header + encoded_dates + encoded_values + encoded_meta_ids
+
+
+def __decode_chunk(reader):
+    """
+        Decode the chunk at the current position of reader.
+
+        :returns: tuple -- (dates, values, meta_ids) arrays.
+    """
+    records, first, last, encoding, dates_size, values_size, meta_size = unpack(
+        chunk_header_format, reader.read(chunk_header_size)
+    )
+
+    encoded_dates = reader.read(dates_size)
+    if encoding == dates_regular:
+        delta = unpack("<q", encoded_dates)[0]
+        dates = first + np.arange(records, dtype=np.int64) * delta
+    else:
+        deltas = np.frombuffer(zlib.decompress(encoded_dates), dtype="<i8")
+        dates = np.empty(records, dtype=np.int64)
+        dates[0] = first
+        np.cumsum(deltas, out=dates[1:])
+        dates[1:] += first
+
+    shuffled = np.frombuffer(zlib.decompress(reader.read(values_size)), np.uint8)
+    xored = shuffled.reshape(8, records).T.copy().view("<u8").ravel()
+    values = np.bitwise_xor.accumulate(xored).view("<f8")
+
+    encoded_meta_ids = np.frombuffer(reader.read(meta_size), dtype=np.uint8)
+    runs = meta_size // 8
+    meta_ids = np.repeat(
+        encoded_meta_ids[: runs * 4].view("<i4"),
+        encoded_meta_ids[runs * 4 :].view("<u4"),
+    )
+
+    return dates, values, meta_ids
+
+
+def __empty_columns():
+    return (
+        np.empty(0, dtype=np.int64),
+        np.empty(0, dtype=np.float64),
+        np.empty(0, dtype=np.int32),
+    )
+
+
+def iter_chunks(filename, chunks):
+    """
+        Decode the given chunks of a chunked format data file one at a time.
+
+        :param filename: Data file to read.
+        :type filename: string
+        :param chunks: Chunks to decode, as returned by read_index.
+        :type chunks: list
+        :returns: generator -- (dates, values, meta_ids) arrays of each chunk.
+    """
+    with open(filename, "rb") as reader:
+        for offset, records, first, last in chunks:
+            reader.seek(offset, os.SEEK_SET)
+            yield __decode_chunk(reader)
+
+
+def read_chunks(filename, chunks):
+    """
+        Decode the given chunks of a chunked format data file.
+
+        :param filename: Data file to read.
+        :type filename: string
+        :param chunks: Chunks to decode, as returned by read_index.
+        :type chunks: list
+        :returns: tuple -- (dates, values, meta_ids) arrays.
+    """
+    decoded = list(iter_chunks(filename, chunks))
+
+    if len(decoded) == 0:
+        return __empty_columns()
+
+    return tuple(np.concatenate(column) for column in zip(*decoded))
+
+
+def iter_read(filename, start=None, end=None):
+    """
+        Decode the records of a chunked format data file one chunk at a
+        time, optionally only those between start and end (inclusive).
+
+        Only the chunks overlapping the requested window are decoded.
+
+        :param filename: Data file to read.
+        :type filename: string
+        :param start: Only read records on or after this datestamp. (Optional)
+        :type start: int
+        :param end: Only read records on or before this datestamp. (Optional)
+        :type end: int
+        :returns: generator -- (dates, values, meta_ids) arrays of each chunk.
+    """
+    chunk_records, chunks = read_index(filename)
+
+    with open(filename, "rb") as reader:
+        for offset, records, first, last in chunks:
+            if (start is not None and last < start) or (
+                end is not None and first > end
+            ):
+                continue
+
+            reader.seek(offset, os.SEEK_SET)
+            dates, values, meta_ids = __decode_chunk(reader)
+
+            if (start is not None and first < start) or (
+                end is not None and last > end
+            ):
+                lower = 0 if start is None else np.searchsorted(dates, start, "left")
+                upper = (
+                    len(dates) if end is None else np.searchsorted(dates, end, "right")
+                )
+                dates, values, meta_ids = (
+                    dates[lower:upper],
+                    values[lower:upper],
+                    meta_ids[lower:upper],
+                )
+
+            yield dates, values, meta_ids
+
+
+def read(filename, start=None, end=None):
+    """
+        Read the records of a chunked format data file, optionally only
+        those between start and end (inclusive).
+
+        Only the chunks overlapping the requested window are decoded.
+
+        :param filename: Data file to read.
+        :type filename: string
+        :param start: Only read records on or after this datestamp. (Optional)
+        :type start: int
+        :param end: Only read records on or before this datestamp. (Optional)
+        :type end: int
+        :returns: tuple -- (dates, values, meta_ids) arrays.
+    """
+    decoded = list(iter_read(filename, start, end))
+
+    if len(decoded) == 0:
+        return __empty_columns()
+
+    return tuple(np.concatenate(column) for column in zip(*decoded))
+
+
+def __copy_bytes(reader, writer, count=None):
+    """
+        Copy count bytes (or everything remaining if None) from reader to
+        writer a buffer at a time.
+    """
+    while count is None or count > 0:
+        size = copy_buffer_size if count is None else min(count, copy_buffer_size)
+        data = reader.read(size)
+        if len(data) == 0:
+            break
+
+        writer.write(data)
+        if count is not None:
+            count -= len(data)
+
+
+def replace(filename, first_chunk, last_chunk, blocks):
+    """
+        Replace the chunks from first_chunk up to (but not including)
+        last_chunk with the records of blocks.
+
+        The chunks before first_chunk and from last_chunk onwards are copied
+        unchanged, without being decoded. The records of blocks are
+        regrouped into new chunks of chunk_records records, so unless
+        last_chunk is None (replace to the end of the file) they must fill
+        a whole number of chunks. Only one block is decoded into memory at
+        a time. The new file is written alongside and moved into place
+        once complete.
+
+        :param filename: Data file to update.
+        :type filename: string
+        :param first_chunk: Index of the first chunk to replace.
+        :type first_chunk: int
+        :param last_chunk: Index of the first chunk after those replaced,
+            or None to replace every chunk from first_chunk onwards.
+        :type last_chunk: int
+        :param blocks: (dates, values, meta_ids) arrays of consecutive
+            blocks of records.
+        :type blocks: iterable
+        :raises: ValueError
+    """
+    chunk_records, chunks = read_index(filename)
+
+    if first_chunk < len(chunks):
+        keep = chunks[first_chunk][0]
+    else:
+        keep = os.path.getsize(filename)
+
+    if last_chunk is not None and last_chunk < len(chunks):
+        following = chunks[last_chunk][0]
+    else:
+        following = None
+
+    tmp_file = filename + ".tmp"
+    writer = open(tmp_file, "wb")
+    try:
+        with writer, open(filename, "rb") as reader:
+            __copy_bytes(reader, writer, keep)
+
+            pending = __empty_columns()
+            for block in blocks:
+                if len(pending[0]) == 0:
+                    pending = block
+                else:
+                    pending = tuple(np.concatenate(c) for c in zip(pending, block))
+
+                while len(pending[0]) >= chunk_records:
+                    writer.write(__encode_chunk(*(c[:chunk_records] for c in pending)))
+                    pending = tuple(c[chunk_records:] for c in pending)
+
+            if len(pending[0]) > 0:
+                if following is not None:
+                    raise ValueError(
+                        "Records must fill whole chunks when replacing chunks "
+                        "before the end of the file"
+                    )
+
+                writer.write(__encode_chunk(*pending))
+
+            if following is not None:
+                reader.seek(following, os.SEEK_SET)
+                __copy_bytes(reader, writer)
+    except:
+        os.remove(tmp_file)
+        raise
+
+    os.replace(tmp_file, filename)
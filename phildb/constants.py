@@ -1,5 +1,8 @@
-DB_VERSION = "0.0.6"
+DB_VERSION = "0.0.7"
 METADATA_DB = "tsdb.sqlite"
+DATA_FORMATS = ("legacy", "chunked")
+METADATA_POOL_SIZE = 5
+METADATA_MMAP_SIZE = 256 * 1024 * 1024
 DEFAULT_META_ID = 0
 METADATA_MISSING_VALUE = 9999
 MISSING_VALUE = -9999
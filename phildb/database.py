@@ -1,27 +1,37 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+import glob
 import hashlib
 import os
+import sqlite3
+import threading
 import types
 import uuid
 
+import numpy as np
 import pandas as pd
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import sessionmaker, joinedload
+from sqlalchemy.orm import scoped_session, sessionmaker, joinedload
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm.exc import NoResultFound
 
 import logging
 
 logger = logging.getLogger("PhilDB_database")
 
+from phildb import chunked
 from phildb import constants
 from phildb import reader
+from phildb import summary
 from phildb import writer
 from phildb.dbstructures import SchemaVersion, Timeseries, Measurand, TimeseriesInstance
 from phildb.dbstructures import Source
 from phildb.dbstructures import Attribute, AttributeValue
 from phildb.exceptions import DuplicateError, MissingAttributeError, MissingDataError
+from phildb.log_handler import open_log
 
 
 class PhilDB(object):
@@ -40,11 +50,84 @@ class PhilDB(object):
                 )
             )
 
-        self.__engine = create_engine("sqlite:///{0}".format(self.__meta_data_db()))
-        self.Session = sessionmaker()
-        self.Session.configure(bind=self.__engine)
+        self.__engine = create_engine(
+            "sqlite:///{0}".format(self.__meta_data_db()),
+            poolclass=QueuePool,
+            pool_size=constants.METADATA_POOL_SIZE,
+            connect_args={"check_same_thread": False},
+        )
+        event.listen(self.__engine, "connect", self.__configure_connection)
+
+        # Sessions are reused within a thread and closed at the end of the
+        # outermost __session_scope.
+        self.Session = scoped_session(sessionmaker(bind=self.__engine))
+        self.__scope = threading.local()
+
+        # Lookup of (identifier, freq) to timeseries instances used to
+        # resolve file paths, loaded on first use by __get_ts_uuid.
+        self.__instance_cache = None
+
+        assert self.version() == constants.DB_VERSION, (
+            "PhilDB database schema version {0} doesn't match {1}, "
+            "upgrade it with phil-upgrade".format(self.version(), constants.DB_VERSION)
+        )
+
+    def __configure_connection(self, dbapi_connection, connection_record):
+        """
+            Tune each new SQLite connection to the meta-database.
+
+            Write-ahead logging with synchronous=NORMAL avoids syncing the
+            journal on every commit and lets readers run alongside a writer.
+            Pages are read through a memory map of up to
+            constants.METADATA_MMAP_SIZE bytes.
+        """
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.OperationalError:
+            # Read only databases keep their existing journal mode.
+            pass
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA mmap_size={0}".format(constants.METADATA_MMAP_SIZE))
+        cursor.close()
+
+    @contextmanager
+    def __session_scope(self, session=None):
+        """
+            Provide a session for a series of operations.
 
-        assert self.version() == constants.DB_VERSION
+            The session is shared by nested scopes in the same thread and is
+            rolled back on error and closed when the outermost scope exits,
+            returning its connection to the pool.
+
+            :param session: Use this session as is, leaving it open. (Optional)
+            :type session: sqlalchemy.orm.sessionmaker.Session
+            :returns: sqlalchemy.orm.Session -- Session for this thread.
+        """
+        if session is not None:
+            yield session
+            return
+
+        session = self.Session()
+        depth = getattr(self.__scope, "depth", 0)
+        self.__scope.depth = depth + 1
+        try:
+            yield session
+        except:
+            if depth == 0:
+                session.rollback()
+            raise
+        finally:
+            self.__scope.depth = depth
+            if depth == 0:
+                session.close()
+
+    def close(self):
+        """
+            Close the sessions and connections to the meta-database.
+        """
+        self.Session.remove()
+        self.__engine.dispose()
 
     def __meta_data_db(self):
         return os.path.join(self.tsdb_path, constants.METADATA_DB)
@@ -78,10 +161,10 @@ class PhilDB(object):
 
             :returns: string -- Schema version.
         """
-        session = self.Session()
-        query = session.query(SchemaVersion.version)
+        with self.__session_scope() as session:
+            query = session.query(SchemaVersion.version)
 
-        version = query.scalar()
+            version = query.scalar()
 
         return version
 
@@ -93,13 +176,50 @@ class PhilDB(object):
             :type identifier: string
         """
         the_id = identifier.strip()
-        session = self.Session()
-        ts = Timeseries(primary_id=the_id)
-        session.add(ts)
-        try:
+        with self.__session_scope() as session:
+            ts = Timeseries(primary_id=the_id)
+            session.add(ts)
+            try:
+                session.commit()
+            except IntegrityError:
+                raise DuplicateError("Already exists: '{0}'".format(the_id))
+
+    def add_timeseries_bulk(self, identifiers):
+        """
+            Create timeseries entries for many IDs in a single transaction.
+
+            Unlike add_timeseries, IDs that already exist don't raise a
+            DuplicateError. They are skipped and returned instead.
+
+            :param identifiers: Identifiers of the timeseries.
+            :type identifiers: array[string]
+            :returns: list(string) -- Identifiers that already existed.
+        """
+        with self.__session_scope() as session:
+            existing = set(
+                primary_id
+                for primary_id, in self.__query_in_chunks(
+                    session.query(Timeseries.primary_id),
+                    Timeseries.primary_id,
+                    [identifier.strip() for identifier in identifiers],
+                )
+            )
+
+            duplicates = []
+            new_records = []
+            for identifier in identifiers:
+                the_id = identifier.strip()
+                if the_id in existing:
+                    duplicates.append(the_id)
+                else:
+                    existing.add(the_id)
+                    new_records.append({"primary_id": the_id})
+
+            if len(new_records) > 0:
+                session.execute(Timeseries.__table__.insert(), new_records)
             session.commit()
-        except IntegrityError:
-            raise DuplicateError("Already exists: '{0}'".format(the_id))
+
+        return duplicates
 
     def add_measurand(self, measurand_short_id, measurand_long_id, description):
         """
@@ -116,15 +236,15 @@ class PhilDB(object):
         """
         short_id = measurand_short_id.strip()
         long_id = measurand_long_id.strip()
-        session = self.Session()
-        measurand = Measurand(
-            short_id=short_id, long_id=long_id, description=description
-        )
-        session.add(measurand)
-        try:
-            session.commit()
-        except IntegrityError:
-            raise DuplicateError("Already exists: '{0}'".format(measurand_short_id))
+        with self.__session_scope() as session:
+            measurand = Measurand(
+                short_id=short_id, long_id=long_id, description=description
+            )
+            session.add(measurand)
+            try:
+                session.commit()
+            except IntegrityError:
+                raise DuplicateError("Already exists: '{0}'".format(measurand_short_id))
 
     def add_source(self, source, description):
         """
@@ -141,13 +261,13 @@ class PhilDB(object):
             :type description: string
         """
         short_id = source.strip()
-        session = self.Session()
-        source = Source(short_id=short_id, description=description)
-        session.add(source)
-        try:
-            session.commit()
-        except IntegrityError:
-            raise DuplicateError("Already exists: '{0}'".format(source))
+        with self.__session_scope() as session:
+            source = Source(short_id=short_id, description=description)
+            session.add(source)
+            try:
+                session.commit()
+            except IntegrityError:
+                raise DuplicateError("Already exists: '{0}'".format(source))
 
     def add_attribute(self, attribute_id, description):
         """
@@ -159,10 +279,10 @@ class PhilDB(object):
             :type description: string
         """
         short_id = attribute_id.strip().upper()
-        session = self.Session()
-        attribute = Attribute(short_id=short_id, description=description)
-        session.add(attribute)
-        session.commit()
+        with self.__session_scope() as session:
+            attribute = Attribute(short_id=short_id, description=description)
+            session.add(attribute)
+            session.commit()
 
     def add_attribute_value(self, attribute_id, value):
         """
@@ -174,19 +294,20 @@ class PhilDB(object):
             :type value: string
         """
         short_id = attribute_id.strip().upper()
-        session = self.Session()
-
-        query = session.query(Attribute).filter(Attribute.short_id == short_id)
-        try:
-            attribute = query.one()
-        except NoResultFound as e:
-            raise MissingAttributeError(
-                "Could not find {0} ({1}) in the database.".format(attribute_id, value)
-            )
+        with self.__session_scope() as session:
+            query = session.query(Attribute).filter(Attribute.short_id == short_id)
+            try:
+                attribute = query.one()
+            except NoResultFound as e:
+                raise MissingAttributeError(
+                    "Could not find {0} ({1}) in the database.".format(
+                        attribute_id, value
+                    )
+                )
 
-        attribute = AttributeValue(attribute_id=attribute.id, attribute_value=value)
-        session.add(attribute)
-        session.commit()
+            attribute = AttributeValue(attribute_id=attribute.id, attribute_value=value)
+            session.add(attribute)
+            session.commit()
 
     def __parse_attribute_kwargs(self, **kwargs):
         """
@@ -206,7 +327,9 @@ class PhilDB(object):
 
         return attributes
 
-    def add_timeseries_instance(self, identifier, freq, initial_metadata, **kwargs):
+    def add_timeseries_instance(
+        self, identifier, freq, initial_metadata, data_format="legacy", **kwargs
+    ):
         """
             Define an instance of a timeseries.
 
@@ -219,47 +342,183 @@ class PhilDB(object):
             :param initial_metadata: Store some metadata about this series.
                 Potentially freeform header from a source file about to be loaded.
             :type initial_metadata: string
+            :param data_format: Format of the data file, 'legacy' for
+                uncompressed records or 'chunked' for compressed chunks.
+                (Default='legacy')
+            :type data_format: string
             :param \*\*kwargs: Any additional attributes to attach to the timeseries instance.
             :type \*\*kwargs: kwargs
         """
-        session = self.Session()
+        self.__check_data_format(data_format)
 
-        timeseries = self.__get_record_by_id(identifier, session)
+        with self.__session_scope() as session:
+            timeseries = self.__get_record_by_id(identifier, session)
 
-        attributes = self.__parse_attribute_kwargs(session=session, **kwargs)
+            attributes = self.__parse_attribute_kwargs(session=session, **kwargs)
 
-        query = session.query(TimeseriesInstance).filter_by(
-            timeseries=timeseries, freq=freq, **attributes
-        )
-        try:
-            record = query.one()
-            session.rollback()
-            raise DuplicateError(
-                "TimeseriesInstance for ({:}) already exists.".format(
-                    identifier, **kwargs
-                )
+            query = session.query(TimeseriesInstance).filter_by(
+                timeseries=timeseries, freq=freq, **attributes
             )
-        except NoResultFound as e:
-            # No result is good, we can now create a ts instance.
-            pass
-
-        with session.no_autoflush:
-            tsi = TimeseriesInstance(initial_metadata=initial_metadata)
-            tsi.measurand = attributes["measurand"]
-            tsi.source = attributes["source"]
-            tsi.freq = freq
-            tsi.uuid = uuid.uuid4().hex
-            timeseries.ts_instances.append(tsi)
-
-            session.add(tsi)
             try:
-                session.commit()
-            except IntegrityError:
+                record = query.one()
+                session.rollback()
                 raise DuplicateError(
-                    "Timeseries instance already exists: '{0}', '{1}'".format(
-                        identifier, freq
+                    "TimeseriesInstance for ({:}) already exists.".format(
+                        identifier, **kwargs
+                    )
+                )
+            except NoResultFound as e:
+                # No result is good, we can now create a ts instance.
+                pass
+
+            with session.no_autoflush:
+                tsi = TimeseriesInstance(initial_metadata=initial_metadata)
+                tsi.measurand = attributes["measurand"]
+                tsi.source = attributes["source"]
+                tsi.freq = freq
+                tsi.uuid = ts_uuid = uuid.uuid4().hex
+                timeseries.ts_instances.append(tsi)
+
+                session.add(tsi)
+                try:
+                    session.commit()
+                except IntegrityError:
+                    raise DuplicateError(
+                        "Timeseries instance already exists: '{0}', '{1}'".format(
+                            identifier, freq
+                        )
                     )
+
+        self.__instance_cache = None
+
+        self.__create_data_file(ts_uuid, data_format)
+
+    def __check_data_format(self, data_format):
+        """
+            Check data_format is one of constants.DATA_FORMATS.
+
+            :raises: ValueError
+        """
+        if data_format not in constants.DATA_FORMATS:
+            raise ValueError("Unknown data format: {0}".format(data_format))
+
+    def __create_data_file(self, ts_uuid, data_format):
+        """
+            Create the data file of a new timeseries instance.
+
+            Legacy format files are created on first write, only chunked
+            format files need to exist beforehand.
+        """
+        if data_format == "chunked":
+            chunked.create(os.path.join(self.__data_dir(), ts_uuid + ".tsdb"))
+
+    def add_timeseries_instances_bulk(
+        self, instances, freq, data_format="legacy", **kwargs
+    ):
+        """
+            Define many instances of timeseries sharing the same frequency and
+            attributes in a single transaction.
+
+            The timeseries must already exist, if any can't be found a
+            MissingDataError is raised and no instances are added. Unlike
+            add_timeseries_instance, instances that already exist don't raise a
+            DuplicateError. They are skipped and returned instead.
+
+            :param instances: (identifier, initial_metadata) of each instance.
+            :type instances: list
+            :param freq: Data frequency (e.g. 'D' for day, as supported by pandas.)
+            :type freq: string
+            :param data_format: Format of the data files, see add_timeseries_instance.
+            :type data_format: string
+            :param \*\*kwargs: Any additional attributes to attach to the timeseries instances.
+            :type \*\*kwargs: kwargs
+            :returns: list(string) -- Identifiers of the instances that already existed.
+            :raises: MissingDataError
+        """
+        self.__check_data_format(data_format)
+
+        instances = [
+            (identifier.strip(), initial_metadata)
+            for identifier, initial_metadata in instances
+        ]
+
+        with self.__session_scope() as session:
+            attributes = self.__parse_attribute_kwargs(session=session, **kwargs)
+            measurand = attributes["measurand"]
+            source = attributes["source"]
+
+            identifiers = [identifier for identifier, initial_metadata in instances]
+            ts_ids = dict(
+                self.__query_in_chunks(
+                    session.query(Timeseries.primary_id, Timeseries.id),
+                    Timeseries.primary_id,
+                    identifiers,
                 )
+            )
+
+            missing = [i for i in identifiers if i not in ts_ids]
+            if len(missing) > 0:
+                raise MissingDataError(
+                    "Could not find metadata record for: {0}".format(", ".join(missing))
+                )
+
+            existing = set(
+                ts_id
+                for ts_id, in self.__query_in_chunks(
+                    session.query(TimeseriesInstance.ts_id).filter_by(
+                        freq=freq, measurand_id=measurand.id, source_id=source.id
+                    ),
+                    TimeseriesInstance.ts_id,
+                    list(ts_ids.values()),
+                )
+            )
+
+            duplicates = []
+            new_records = []
+            for identifier, initial_metadata in instances:
+                ts_id = ts_ids[identifier]
+                if ts_id in existing:
+                    duplicates.append(identifier)
+                    continue
+
+                existing.add(ts_id)
+                new_records.append(
+                    {
+                        "ts_id": ts_id,
+                        "freq": freq,
+                        "measurand_id": measurand.id,
+                        "source_id": source.id,
+                        "initial_metadata": initial_metadata,
+                        "uuid": uuid.uuid4().hex,
+                    }
+                )
+
+            if len(new_records) > 0:
+                session.execute(TimeseriesInstance.__table__.insert(), new_records)
+            session.commit()
+
+        self.__instance_cache = None
+
+        for record in new_records:
+            self.__create_data_file(record["uuid"], data_format)
+
+        return duplicates
+
+    def __query_in_chunks(self, query, column, values, chunk_size=500):
+        """
+            Run query restricted to rows where column is in values.
+
+            The values are split into chunks to stay within the SQLite limit
+            on the number of parameters in a statement.
+
+            :returns: list -- Combined results of each chunk.
+        """
+        values = list(values)
+        results = []
+        for i in range(0, len(values), chunk_size):
+            results.extend(query.filter(column.in_(values[i : i + chunk_size])).all())
+
+        return results
 
     def __get_record_by_id(self, identifier, session=None):
         """
@@ -274,18 +533,18 @@ class PhilDB(object):
             :returns: Single session.query result.
             :raises: MissingDataError
         """
-        if session is None:
-            session = self.Session()
-
-        query = session.query(Timeseries).filter(Timeseries.primary_id == identifier)
-        try:
-            record = query.one()
-        except NoResultFound as e:
-            raise MissingDataError(
-                "Could not find metadata record for: {0}".format(identifier)
+        with self.__session_scope(session) as session:
+            query = session.query(Timeseries).filter(
+                Timeseries.primary_id == identifier
             )
+            try:
+                record = query.one()
+            except NoResultFound as e:
+                raise MissingDataError(
+                    "Could not find metadata record for: {0}".format(identifier)
+                )
 
-        return record
+            return record
 
     def __get_attribute(self, attribute, value, session=None):
         """
@@ -300,39 +559,39 @@ class PhilDB(object):
             :returns: Single session.query result.
             :raises: MissingAttributeError
         """
-        if session is None:
-            session = self.Session()
-
-        if attribute == "measurand":
-            query = session.query(Measurand).filter(Measurand.short_id == value)
-        elif attribute == "source":
-            query = session.query(Source).filter(Source.short_id == value)
-        elif attribute == "timeseries":
-            query = session.query(Timeseries).filter(Timeseries.primary_id == value)
-        elif attribute == "provider":
-            short_id = attribute.strip().upper()
-            query = session.query(Attribute).filter(Attribute.short_id == short_id)
+        with self.__session_scope(session) as session:
+            if attribute == "measurand":
+                query = session.query(Measurand).filter(Measurand.short_id == value)
+            elif attribute == "source":
+                query = session.query(Source).filter(Source.short_id == value)
+            elif attribute == "timeseries":
+                query = session.query(Timeseries).filter(Timeseries.primary_id == value)
+            elif attribute == "provider":
+                short_id = attribute.strip().upper()
+                query = session.query(Attribute).filter(Attribute.short_id == short_id)
+                try:
+                    record = query.one()
+                except NoResultFound as e:
+                    raise MissingAttributeError(
+                        "Could not find {0} ({1}) in the database.".format(
+                            attribute, value
+                        )
+                    )
+                query = session.query(AttributeValue).filter(
+                    AttributeValue.attribute_id == record.id,
+                    AttributeValue.attribute_value == value,
+                )
+            else:
+                raise MissingAttributeError("Attribute {0} unknown".format(attribute))
+
             try:
                 record = query.one()
             except NoResultFound as e:
                 raise MissingAttributeError(
                     "Could not find {0} ({1}) in the database.".format(attribute, value)
                 )
-            query = session.query(AttributeValue).filter(
-                AttributeValue.attribute_id == record.id,
-                AttributeValue.attribute_value == value,
-            )
-        else:
-            raise MissingAttributeError("Attribute {0} unknown".format(attribute))
-
-        try:
-            record = query.one()
-        except NoResultFound as e:
-            raise MissingAttributeError(
-                "Could not find {0} ({1}) in the database.".format(attribute, value)
-            )
 
-        return record
+            return record
 
     def get_file_path(self, identifier, freq, ftype="tsdb", **kwargs):
         """
@@ -346,9 +605,41 @@ class PhilDB(object):
             :returns: string -- Path to file for a timeseries instance identified
                 by the given arguments.
         """
-        record = self.__get_ts_instance(identifier, freq, **kwargs)
+        ts_uuid = self.__get_ts_uuid(identifier, freq, **kwargs)
+
+        return os.path.join(self.__data_dir(), ts_uuid + "." + ftype)
+
+    def __instance_uuids(self, instances):
+        """
+            Group the uuids of instances by identifier and frequency.
+
+            :param instances: Result of __query_instances.
+            :type instances: list
+            :returns: dict -- Mapping of (identifier, freq) to a list of uuids.
+        """
+        uuids = {}
+        for ts_id, freq, measurand, source, ts_uuid in instances:
+            uuids.setdefault((ts_id, freq), []).append(ts_uuid)
+
+        return uuids
+
+    def __resolve_file_path(self, uuids, identifier, freq, ftype="tsdb", **kwargs):
+        """
+            Get a path to a file for a timeseries instance from pre-fetched uuids.
+
+            Falls back to get_file_path unless exactly one uuid was found,
+            which raises the appropriate error for missing or ambiguous
+            instances.
+
+            :param uuids: Result of __instance_uuids.
+            :type uuids: dict
+            :returns: string -- Path to file for the timeseries instance.
+        """
+        matches = uuids.get((identifier, freq), [])
+        if len(matches) == 1:
+            return os.path.join(self.__data_dir(), matches[0] + "." + ftype)
 
-        return os.path.join(self.__data_dir(), record.uuid + "." + ftype)
+        return self.get_file_path(identifier, freq, ftype=ftype, **kwargs)
 
     def write(self, identifier, freq, ts, **kwargs):
         """
@@ -369,22 +660,279 @@ class PhilDB(object):
 
         writer.write_log(log_file, modified, datetime.utcnow())
 
-    def read(self, identifier, freq, **kwargs):
+    def write_many(self, items, workers=None, **kwargs):
+        """
+            Write/update timeseries data for a batch of existing timeseries.
+
+            The file paths of all the timeseries are looked up before any
+            data is written and the changes of the whole batch are logged
+            against the same replacement datetime. Writes to the same
+            timeseries instance are applied in the order given.
+
+            :param items: (identifier, freq, ts) of each timeseries to write.
+            :type items: list
+            :param workers: Number of processes used to write the timeseries,
+                the timeseries are written in this process if None. (Optional)
+            :type workers: int
+            :param kwargs: Attributes to match against timeseries instances (e.g. source, measurand).
+            :type kwargs: kwargs
+            :returns: list -- Log entries of each write, as returned by
+                writer.write, or the exception raised writing it.
         """
-            Read the entire timeseries record for the requested timeseries instance.
+        items = list(items)
+        replacement_datetime = datetime.utcnow()
+
+        if self.__is_instance_query(kwargs):
+            uuids = self.__instance_uuids(self.__query_instances(**kwargs))
+        else:
+            uuids = {}
+
+        results = [None] * len(items)
+        batches = {}
+        for i, (identifier, freq, ts) in enumerate(items):
+            try:
+                tsdb_file = self.__resolve_file_path(uuids, identifier, freq, **kwargs)
+            except Exception as e:
+                results[i] = e
+                continue
+
+            log_file = os.path.splitext(tsdb_file)[0] + ".hdf5"
+            batch = batches.setdefault(tsdb_file, ([], []))
+            batch[0].append(i)
+            batch[1].append((tsdb_file, log_file, ts, freq))
+
+        if workers is None:
+            batch_results = [
+                writer.write_batch(writes, replacement_datetime)
+                for indexes, writes in batches.values()
+            ]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(writer.write_batch, writes, replacement_datetime)
+                    for indexes, writes in batches.values()
+                ]
+                batch_results = [future.result() for future in futures]
+
+        for (indexes, writes), batch_result in zip(batches.values(), batch_results):
+            for i, result in zip(indexes, batch_result):
+                results[i] = result
+
+        return results
+
+    def read(self, identifier, freq, start=None, end=None, **kwargs):
+        """
+            Read the timeseries record for the requested timeseries instance.
+
+            Reads the entire record unless start and/or end are given, in
+            which case only the requested window is read from disk.
 
             :param identifier: Identifier of the timeseries.
             :type identifier: string
             :param freq: Timeseries data frequency.
             :type freq: string
+            :param start: Only read data on or after this date. (Optional)
+            :type start: datetime
+            :param end: Only read data on or before this date. (Optional)
+            :type end: datetime
             :param kwargs: Attributes to match against timeseries instances (e.g. source, measurand).
             :type kwargs: kwargs
 
             :returns: pandas.DataFrame -- Timeseries data.
         """
-        return reader.read(self.get_file_path(identifier, freq, **kwargs))
+        return reader.read(
+            self.get_file_path(identifier, freq, **kwargs), start, end, freq
+        )
+
+    def read_mapped(self, identifier, freq, start=None, end=None, **kwargs):
+        """
+            Read the timeseries record for the requested timeseries instance as a memory mapped view.
+
+            No copy of the data is made until the returned view is
+            materialised with its to_series method.
+
+            :param identifier: Identifier of the timeseries.
+            :type identifier: string
+            :param freq: Timeseries data frequency.
+            :type freq: string
+            :param start: Only read data on or after this date. (Optional)
+            :type start: datetime
+            :param end: Only read data on or before this date. (Optional)
+            :type end: datetime
+            :param kwargs: Attributes to match against timeseries instances (e.g. source, measurand).
+            :type kwargs: kwargs
+
+            :returns: reader.MappedSeries -- Lazy view of the timeseries data.
+        """
+        return reader.read_mapped(
+            self.get_file_path(identifier, freq, **kwargs), start, end, freq
+        )
+
+    def read_latest(self, identifier, freq, n=1, **kwargs):
+        """
+            Read the last n records of the requested timeseries instance.
+
+            Only the end of the data file is read.
+
+            :param identifier: Identifier of the timeseries.
+            :type identifier: string
+            :param freq: Timeseries data frequency.
+            :type freq: string
+            :param n: Number of records to read. (Default=1)
+            :type n: int
+            :param kwargs: Attributes to match against timeseries instances (e.g. source, measurand).
+            :type kwargs: kwargs
+
+            :returns: pandas.Series -- Timeseries data.
+        """
+        return reader.read_latest(self.get_file_path(identifier, freq, **kwargs), n)
+
+    def read_latest_many(self, identifiers, freq, n=1, **kwargs):
+        """
+            Read the last n records of each of the requested timeseries instances.
+
+            The file paths of all the timeseries are looked up together and
+            only the end of each data file is read.
+
+            :param identifiers: Identifiers of the timeseries to read.
+            :type identifiers: array[string]
+            :param freq: Timeseries data frequency.
+            :type freq: string
+            :param n: Number of records to read from each timeseries. (Default=1)
+            :type n: int
+            :param kwargs: Attributes to match against timeseries instances (e.g. source, measurand).
+            :type kwargs: kwargs
 
-    def read_log(self, identifier, freq, as_at_datetime, **kwargs):
+            :returns: pandas.DataFrame -- Values indexed by identifier and date.
+        """
+        identifiers = list(identifiers)
+        file_paths = [
+            self.get_file_path(ts_id, freq, **kwargs) for ts_id in identifiers
+        ]
+        series = [reader.read_latest(file_path, n) for file_path in file_paths]
+
+        if len(series) == 0:
+            return pd.DataFrame(
+                {"value": []},
+                index=pd.MultiIndex.from_arrays([[], []], names=["identifier", "date"]),
+            )
+
+        return pd.concat(series, keys=identifiers, names=["identifier"]).to_frame()
+
+    def iter_read(
+        self,
+        identifier,
+        freq,
+        start=None,
+        end=None,
+        chunk_records=reader.default_chunk_records,
+        as_series=True,
+        **kwargs
+    ):
+        """
+            Read the timeseries record for the requested timeseries instance in blocks of records.
+
+            Only one block is held in memory at a time. See reader.iter_chunks.
+
+            :param identifier: Identifier of the timeseries.
+            :type identifier: string
+            :param freq: Timeseries data frequency.
+            :type freq: string
+            :param start: Only read data on or after this date. (Optional)
+            :type start: datetime
+            :param end: Only read data on or before this date. (Optional)
+            :type end: datetime
+            :param chunk_records: Maximum number of records in each block.
+            :type chunk_records: int
+            :param as_series: Yield each block as a pandas.Series, otherwise as
+                a (dates, values) tuple of numpy arrays. (Default=True)
+            :type as_series: bool
+            :param kwargs: Attributes to match against timeseries instances (e.g. source, measurand).
+            :type kwargs: kwargs
+
+            :returns: generator -- Blocks of timeseries data.
+        """
+        return reader.iter_chunks(
+            self.get_file_path(identifier, freq, **kwargs),
+            chunk_records,
+            start,
+            end,
+            freq,
+            as_series,
+        )
+
+    def read_resampled(
+        self, identifier, freq, target_freq, how, start=None, end=None, **kwargs
+    ):
+        """
+            Read the timeseries record for the requested timeseries instance resampled to target_freq.
+
+            The record is streamed from disk a block of records at a time
+            rather than read whole, so memory use doesn't grow with the
+            length of the record. Equivalent to resampling the result of
+            read, ignoring missing values.
+
+            :param identifier: Identifier of the timeseries.
+            :type identifier: string
+            :param freq: Timeseries data frequency.
+            :type freq: string
+            :param target_freq: Frequency to resample to (e.g. 'D' for daily).
+            :type target_freq: string
+            :param how: One of 'count', 'sum', 'mean', 'min' or 'max'.
+            :type how: string
+            :param start: Only read data on or after this date. (Optional)
+            :type start: datetime
+            :param end: Only read data on or before this date. (Optional)
+            :type end: datetime
+            :param kwargs: Attributes to match against timeseries instances (e.g. source, measurand).
+            :type kwargs: kwargs
+
+            :returns: pandas.Series -- Resampled timeseries data.
+        """
+        return reader.read_resampled(
+            self.get_file_path(identifier, freq, **kwargs),
+            target_freq,
+            how,
+            start,
+            end,
+            freq,
+        )
+
+    def aggregate(self, identifier, freq, how, period, start=None, end=None, **kwargs):
+        """
+            Aggregate the timeseries record for the requested timeseries instance by period.
+
+            Answered from the summary index of the timeseries, only the
+            records at the boundaries of each period and of the requested
+            window are read. Timeseries without a summary index (see
+            index_summaries) are aggregated by reading every record in the
+            window. Equivalent to resampling the result of read to period,
+            ignoring missing values.
+
+            :param identifier: Identifier of the timeseries.
+            :type identifier: string
+            :param freq: Timeseries data frequency.
+            :type freq: string
+            :param how: One of 'count', 'sum', 'mean', 'min' or 'max'.
+            :type how: string
+            :param period: Period to aggregate to (e.g. 'M' for monthly, 'A' for annual).
+            :type period: string
+            :param start: Only aggregate data on or after this date. (Optional)
+            :type start: datetime
+            :param end: Only aggregate data on or before this date. (Optional)
+            :type end: datetime
+            :param kwargs: Attributes to match against timeseries instances (e.g. source, measurand).
+            :type kwargs: kwargs
+
+            :returns: pandas.Series -- Aggregate of each period, indexed by period.
+        """
+        return summary.aggregate(
+            self.get_file_path(identifier, freq, **kwargs), how, period, start, end
+        )
+
+    def read_log(
+        self, identifier, freq, as_at_datetime, start=None, end=None, **kwargs
+    ):
         """
             Read timeseries record for the requested timeseries instance as it was at specified datetime in the log.
 
@@ -394,16 +942,47 @@ class PhilDB(object):
             :type freq: string
             :param as_at_datetime: Filter to a timeseries, as available at this specified datetime, from the log.
             :type as_at_datetime: datetime
+            :param start: Only read data on or after this date. (Optional)
+            :type start: datetime
+            :param end: Only read data on or before this date. (Optional)
+            :type end: datetime
             :param kwargs: Attributes to match against timeseries instances (e.g. source, measurand).
             :type kwargs: kwargs
 
             :returns: pandas.DataFrame -- Timeseries data.
         """
         return reader.read_log(
-            self.get_file_path(identifier, freq, ftype="hdf5", **kwargs), as_at_datetime
+            self.get_file_path(identifier, freq, ftype="hdf5", **kwargs),
+            as_at_datetime,
+            start,
+            end,
         )
 
-    def read_all(self, freq, excludes=None, **kwargs):
+    def index_logs(self):
+        """
+            Index the change logs of all timeseries instances.
+
+            Logs written by earlier versions of PhilDB don't have the indexes
+            used by read_log. They are indexed on their next write, this
+            indexes all of them up front.
+        """
+        for log_file in glob.glob(os.path.join(self.__data_dir(), "*.hdf5")):
+            with open_log(log_file, "a") as log:
+                log.create_indexes()
+
+    def index_summaries(self):
+        """
+            Summarise the data files of all timeseries instances.
+
+            Data files written by earlier versions of PhilDB don't have the
+            summary index used by aggregate. They are summarised on their
+            next write, this summarises all of them up front.
+        """
+        for tsdb_file in glob.glob(os.path.join(self.__data_dir(), "*.tsdb")):
+            if not os.path.exists(summary.summary_file(tsdb_file)):
+                summary.create(tsdb_file)
+
+    def read_all(self, freq, excludes=None, workers=None, **kwargs):
         """
             Read the entire timeseries record for all matching timeseries instances.
             Optionally exclude timeseries from the final DataFrame by specifying IDs in the exclude argument.
@@ -414,20 +993,31 @@ class PhilDB(object):
             :type freq: string
             :param excludes: IDs of timeseries to exclude from final DataFrame.
             :type excludes: array[string]
+            :param workers: Number of threads used to read the timeseries. (Optional)
+            :type workers: int
             :param kwargs: Attributes to match against timeseries instances (e.g. source, measurand).
             :type kwargs: kwargs
 
             :returns: pandas.DataFrame -- Timeseries data.
         """
-        data = {}
-        if excludes is None:
-            identifiers = self.ts_list(**kwargs)
+        if self.__is_instance_query(kwargs):
+            instances = self.__query_instances(**kwargs)
+            if len(instances) == 0:
+                # Raises MissingAttributeError for unknown attributes.
+                self.__parse_attribute_kwargs(**kwargs)
+            identifiers = set(instance[0] for instance in instances)
         else:
-            identifiers = set(self.ts_list(**kwargs)).difference(excludes)
+            instances = []
+            identifiers = set(self.ts_list(**kwargs))
 
-        return self.read_dataframe(identifiers, freq, **kwargs)
+        if excludes is not None:
+            identifiers = identifiers.difference(excludes)
 
-    def read_dataframe(self, identifiers, freq, **kwargs):
+        return self.__read_dataframe(
+            sorted(identifiers), freq, instances, workers, **kwargs
+        )
+
+    def read_dataframe(self, identifiers, freq, workers=None, **kwargs):
         """
             Read the entire timeseries record for the requested timeseries instances.
 
@@ -435,15 +1025,37 @@ class PhilDB(object):
             :type identifiers: array[string]
             :param freq: Timeseries data frequency.
             :type freq: string
+            :param workers: Number of threads used to read the timeseries. (Optional)
+            :type workers: int
             :param kwargs: Attributes to match against timeseries instances (e.g. source, measurand).
             :type kwargs: kwargs
 
             :returns: pandas.DataFrame -- Timeseries data.
         """
-        data = {}
-        for ts_id in identifiers:
-            data[ts_id] = reader.read(self.get_file_path(ts_id, freq, **kwargs))
-        return pd.DataFrame(data)
+        # File paths are resolved through get_file_path, which is backed by
+        # the instance cache, rather than querying every instance of freq.
+        return self.__read_dataframe(identifiers, freq, [], workers, **kwargs)
+
+    def __read_dataframe(self, identifiers, freq, instances, workers=None, **kwargs):
+        """
+            Read the timeseries instances of identifiers into a DataFrame.
+
+            :param instances: Result of __query_instances used to resolve the
+                file paths. Paths of identifiers without exactly one matching
+                instance are resolved by get_file_path.
+            :type instances: list
+            :param workers: Number of threads used to read the files, the
+                files are read sequentially if None.
+            :type workers: int
+        """
+        uuids = self.__instance_uuids(instances)
+
+        file_paths = [
+            self.__resolve_file_path(uuids, ts_id, freq, **kwargs)
+            for ts_id in identifiers
+        ]
+
+        return reader.read_dataframe(file_paths, identifiers, freq, workers)
 
     def ts_list(self, **kwargs):
         """
@@ -454,15 +1066,17 @@ class PhilDB(object):
             :type kwargs: kwargs
             :returns: list(string) -- Sorted list of timeseries identifiers.
         """
-        session = self.Session()
-        query_args = self.__parse_attribute_kwargs(**kwargs)
+        with self.__session_scope() as session:
+            query_args = self.__parse_attribute_kwargs(**kwargs)
 
-        records = (
-            session.query(TimeseriesInstance)
-            .options(joinedload(TimeseriesInstance.timeseries))
-            .filter_by(**query_args)
-        )
-        return sorted(list(set([record.timeseries.primary_id for record in records])))
+            records = (
+                session.query(TimeseriesInstance)
+                .options(joinedload(TimeseriesInstance.timeseries))
+                .filter_by(**query_args)
+            )
+            return sorted(
+                list(set([record.timeseries.primary_id for record in records]))
+            )
 
     def list_ids(self):
         """
@@ -470,10 +1084,9 @@ class PhilDB(object):
 
             :returns: list(string) -- Sorted list of timeseries identifiers.
         """
-        session = self.Session()
-
-        records = session.query(Timeseries)
-        return sorted(list(set([record.primary_id for record in records])))
+        with self.__session_scope() as session:
+            records = session.query(Timeseries)
+            return sorted(list(set([record.primary_id for record in records])))
 
     def list_timeseries_instances(self, **kwargs):
         """
@@ -483,34 +1096,33 @@ class PhilDB(object):
 
             :returns: list(string) -- Sorted list of timeseries instances.
         """
-        session = self.Session()
-
-        initial_args = {}
-        for attr in ["freq"]:
-            attr_val = kwargs.pop(attr, None)
+        with self.__session_scope() as session:
+            initial_args = {}
+            for attr in ["freq"]:
+                attr_val = kwargs.pop(attr, None)
 
-            if attr_val:
-                initial_args[attr] = attr_val
+                if attr_val:
+                    initial_args[attr] = attr_val
 
-        query_args = self.__parse_attribute_kwargs(**kwargs)
-        query_args.update(initial_args)
+            query_args = self.__parse_attribute_kwargs(**kwargs)
+            query_args.update(initial_args)
 
-        records = (
-            session.query(TimeseriesInstance)
-            .options(joinedload(TimeseriesInstance.timeseries))
-            .filter_by(**query_args)
-        )
-        instance_list = []
-        for record in records:
-            instance = {
-                "ts_id": record.timeseries.primary_id,
-                "freq": record.freq,
-                "measurand": record.measurand.short_id,
-                "source": record.source.short_id,
-            }
-            instance_list.append(instance)
-
-        return pd.DataFrame(instance_list)
+            records = (
+                session.query(TimeseriesInstance)
+                .options(joinedload(TimeseriesInstance.timeseries))
+                .filter_by(**query_args)
+            )
+            instance_list = []
+            for record in records:
+                instance = {
+                    "ts_id": record.timeseries.primary_id,
+                    "freq": record.freq,
+                    "measurand": record.measurand.short_id,
+                    "source": record.source.short_id,
+                }
+                instance_list.append(instance)
+
+            return pd.DataFrame(instance_list)
 
     def list_measurands(self):
         """
@@ -518,10 +1130,9 @@ class PhilDB(object):
 
             :returns: list(string) -- Sorted list of timeseries identifiers.
         """
-        session = self.Session()
-
-        records = session.query(Measurand)
-        return sorted(list(set([record.short_id for record in records])))
+        with self.__session_scope() as session:
+            records = session.query(Measurand)
+            return sorted(list(set([record.short_id for record in records])))
 
     def list_sources(self):
         """
@@ -529,10 +1140,9 @@ class PhilDB(object):
 
             :returns: list(string) -- Sorted list of source identifiers.
         """
-        session = self.Session()
-
-        records = session.query(Source)
-        return sorted(list(set([record.short_id for record in records])))
+        with self.__session_scope() as session:
+            records = session.query(Source)
+            return sorted(list(set([record.short_id for record in records])))
 
     def read_metadata(self, ts_id, freq, **kwargs):
         """
@@ -545,6 +1155,106 @@ class PhilDB(object):
         """
         return self.__get_ts_instance(ts_id, freq, **kwargs).initial_metadata
 
+    def __is_instance_query(self, kwargs):
+        """
+            Check if kwargs only contain attributes stored on timeseries instances.
+
+            :returns: bool -- True if the kwargs can be resolved by __query_instances.
+        """
+        attributes = [k for k, v in kwargs.items() if v is not None]
+
+        return set(attributes).issubset(["measurand", "source"])
+
+    def __query_instances(self, freq=None, measurand=None, source=None):
+        """
+            Query the timeseries instances matching the given attributes in a single joined query.
+
+            :param freq: Only include instances of this frequency. (Optional)
+            :type freq: string
+            :param measurand: Only include instances of this measurand. (Optional)
+            :type measurand: string
+            :param source: Only include instances from this source. (Optional)
+            :type source: string
+            :returns: list -- (identifier, freq, measurand, source, uuid) of each instance.
+        """
+        with self.__session_scope() as session:
+            query = (
+                session.query(
+                    Timeseries.primary_id,
+                    TimeseriesInstance.freq,
+                    Measurand.short_id,
+                    Source.short_id,
+                    TimeseriesInstance.uuid,
+                )
+                .join(TimeseriesInstance.timeseries)
+                .join(TimeseriesInstance.measurand)
+                .join(TimeseriesInstance.source)
+            )
+
+            if freq is not None:
+                query = query.filter(TimeseriesInstance.freq == freq)
+            if measurand is not None:
+                query = query.filter(Measurand.short_id == measurand)
+            if source is not None:
+                query = query.filter(Source.short_id == source)
+
+            return query.all()
+
+    def __load_instance_cache(self):
+        """
+            Load the measurand, source and uuid of every timeseries instance in a single query.
+
+            :returns: dict -- Mapping of (identifier, freq) to a list of
+                ({'measurand': ..., 'source': ...}, uuid) tuples.
+        """
+        instances = {}
+        for ts_id, freq, measurand, source, ts_uuid in self.__query_instances():
+            attributes = {"measurand": measurand, "source": source}
+            instances.setdefault((ts_id, freq), []).append((attributes, ts_uuid))
+
+        return instances
+
+    def __get_ts_uuid(self, ts_id, freq, **kwargs):
+        """
+            Get the uuid of the requested timeseries instance.
+
+            Looked up in an in-process cache of the timeseries instances,
+            which is loaded in bulk on first use. Falls back to querying the
+            database when the cache can't uniquely identify the instance
+            (which also raises the appropriate error when it doesn't exist).
+
+            :param ts_id: Identifier of the timeseries.
+            :type ts_id: string
+            :returns: string -- uuid of the timeseries instance.
+            :raises: MissingDataError
+        """
+        # Other threads may reset the cache at any time, so only a local
+        # reference to it is used.
+        cache = self.__instance_cache
+        if cache is None:
+            cache = self.__instance_cache = self.__load_instance_cache()
+
+        attributes = dict((k, v) for k, v in kwargs.items() if v is not None)
+        cacheable = self.__is_instance_query(kwargs)
+
+        if cacheable:
+            matches = [
+                ts_uuid
+                for instance_attributes, ts_uuid in cache.get((ts_id, freq), [])
+                if all(instance_attributes[k] == v for k, v in attributes.items())
+            ]
+            if len(matches) == 1:
+                return matches[0]
+
+        record = self.__get_ts_instance(ts_id, freq, **kwargs)
+
+        # The instance may have been added by another PhilDB object since
+        # the cache was loaded, so reload it on next use.
+        if cacheable:
+            self.__instance_cache = None
+
+        return record.uuid
+
     def __get_ts_instance(self, ts_id, freq, **kwargs):
         """
             Get a database record for the requested timeseries instance.
@@ -557,25 +1267,31 @@ class PhilDB(object):
             :returns: dbstructures.TimeseriesInstance -- Single session.query result.
             :raises: MissingDataError
         """
-        timeseries = self.__get_record_by_id(ts_id)
+        with self.__session_scope() as session:
+            timeseries = self.__get_record_by_id(ts_id)
 
-        query_args = self.__parse_attribute_kwargs(**kwargs)
+            query_args = self.__parse_attribute_kwargs(**kwargs)
 
-        session = self.Session()
-        query = session.query(TimeseriesInstance).filter_by(
-            timeseries=timeseries, freq=freq, **query_args
-        )
-
-        try:
-            record = query.one()
-        except NoResultFound as e:
-            raise MissingDataError(
-                "Could not find TimeseriesInstance for ({:}).".format(
-                    ts_id, freq, **kwargs
+            query = (
+                session.query(TimeseriesInstance)
+                .options(
+                    joinedload(TimeseriesInstance.timeseries),
+                    joinedload(TimeseriesInstance.measurand),
+                    joinedload(TimeseriesInstance.source),
                 )
+                .filter_by(timeseries=timeseries, freq=freq, **query_args)
             )
 
-        return record
+            try:
+                record = query.one()
+            except NoResultFound as e:
+                raise MissingDataError(
+                    "Could not find TimeseriesInstance for ({:}).".format(
+                        ts_id, freq, **kwargs
+                    )
+                )
+
+            return record
 
     def __str__(self):
         return self.tsdb_path
@@ -16,3 +16,7 @@ class MissingAttributeError(Exception):
 
 class MissingDataError(Exception):
     pass
+
+
+class SchemaVersionError(Exception):
+    pass
@@ -1,3 +1,9 @@
+import atexit
+from collections import OrderedDict
+from contextlib import contextmanager
+import os
+import threading
+
 import numpy as np
 import pandas as pd
 import tables
@@ -11,6 +17,11 @@ class TabDesc(tables.IsDescription):
     replacement_time = tables.Int64Col(dflt=0, pos=3)
 
 
+log_entry_dtype = np.dtype(
+    {"names": ["time", "value", "meta"], "formats": ["<i8", "<f8", "<i4"]}
+)
+
+
 class LogHandler:
     """
     """
@@ -31,13 +42,46 @@ class LogHandler:
         except tables.exceptions.NodeError as e:
             pass
 
+        self.create_indexes()
+
         self.hdf5.flush()
 
-    def read(self, as_at_datetime):
+    def create_indexes(self):
+        """
+            Create completely sorted indexes on the time and replacement_time columns.
+
+            Logs created before the indexes were introduced are indexed the
+            first time this is called on them. Once created, the indexes are
+            kept up to date as entries are written.
+        """
+        ts_table = self.hdf5.get_node("/data/log")
+
+        for column in [ts_table.cols.time, ts_table.cols.replacement_time]:
+            if not column.is_indexed:
+                column.create_csindex()
+
+    def read(self, as_at_datetime, start=None, end=None):
+        """
+            Read the timeseries as it was at as_at_datetime from the log.
+
+            :param as_at_datetime: Replacement time to read the timeseries as at (seconds since epoch).
+            :type as_at_datetime: int
+            :param start: Only read entries on or after this time (seconds since epoch). (Optional)
+            :type start: int
+            :param end: Only read entries on or before this time (seconds since epoch). (Optional)
+            :type end: int
+            :returns: pandas.DataFrame -- Timeseries data.
+        """
         field_names = ["time", "value", "meta", "replacement_time"]
         ts_table = self.hdf5.get_node("/data/log")
 
-        records = ts_table.read_where("replacement_time <= {0}".format(as_at_datetime))
+        conditions = ["(replacement_time <= {0})".format(as_at_datetime)]
+        if start is not None:
+            conditions.append("(time >= {0})".format(start))
+        if end is not None:
+            conditions.append("(time <= {0})".format(end))
+
+        records = ts_table.read_where(" & ".join(conditions))
 
         if len(records) == 0:
             return pd.DataFrame(None, columns=field_names)
@@ -61,33 +105,176 @@ class LogHandler:
         return df
 
     def write(self, log_entries, operation_datetime):
+        """
+            Append the created entries of log_entries to the log in a single write.
+
+            :param log_entries: Log entries, as returned by writer.write. The
+                created ('C') entries are either a structured array of
+                log_entry_dtype or a sequence of (time, value, meta) tuples.
+            :type log_entries: dict
+            :param operation_datetime: Replacement time of the entries (seconds since epoch).
+            :type operation_datetime: int
+        """
+        self.create_indexes()
 
         ts_table = self.hdf5.get_node("/data/log")
 
-        index_row = ts_table.row
-        for dt, val, meta in iter(log_entries["C"]):
-            if val is np.nan:
-                val = MISSING_VALUE
-                meta = METADATA_MISSING_VALUE
+        created = np.asarray(log_entries["C"], dtype=log_entry_dtype)
+
+        missing = np.isnan(created["value"])
 
-            index_row["time"] = dt
-            index_row["value"] = val
-            index_row["meta"] = meta
-            index_row["replacement_time"] = operation_datetime
-            index_row.append()
+        rows = np.empty(len(created), dtype=ts_table.dtype)
+        rows["time"] = created["time"]
+        rows["value"] = np.where(missing, MISSING_VALUE, created["value"])
+        rows["meta"] = np.where(missing, METADATA_MISSING_VALUE, created["meta"])
+        rows["replacement_time"] = operation_datetime
+
+        if len(rows) > 0:
+            ts_table.append(rows)
 
         self.hdf5.flush()
 
+    def close(self):
+        """
+            Close the underlying HDF5 file.
+        """
+        if self.hdf5 is not None:
+            self.hdf5.close()
+            self.hdf5 = None
+
     def __enter__(self):
         return self
 
     def __exit__(self, type, value, traceback):
-        self.__del__()
+        self.close()
 
     def __del__(self):
-        if self.hdf5 is not None:
-            self.hdf5.close()
-            self.hdf5 = None
+        self.close()
 
     def __str__(self):
         return str(self.hdf5)
+
+
+class LogHandlerPool(object):
+    """
+        Least recently used pool of open LogHandler objects keyed by filename.
+
+        Log files are opened in append mode and kept open until they are
+        evicted by opening more than max_size files, or the pool is closed.
+        Reads reuse a log already open in the pool, other logs are opened
+        read only just for the read and aren't pooled, so read only logs can
+        be read and other processes aren't locked out of logs that are only
+        read. PyTables isn't thread safe so the pool lock is held while a
+        LogHandler is in use.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.__handlers = OrderedDict()
+        self.__lock = threading.RLock()
+
+    @contextmanager
+    def open(self, filename, mode="a"):
+        """
+            Get an open LogHandler for filename, opening it if it isn't in the pool.
+
+            :param filename: Log file to open.
+            :type filename: string
+            :param mode: 'r' to read or 'a' to append. (Default='a')
+            :type mode: string
+            :returns: LogHandler -- Handler for the log file.
+        """
+        with self.__lock:
+            handler = self.__handlers.pop(filename, None)
+            if handler is None:
+                if mode == "r":
+                    with LogHandler(filename, mode) as handler:
+                        yield handler
+
+                    return
+
+                handler = LogHandler(filename, "a")
+
+            self.__handlers[filename] = handler
+            while len(self.__handlers) > self.max_size:
+                self.__handlers.popitem(last=False)[1].close()
+
+            yield handler
+
+    def close(self):
+        """
+            Close all the LogHandler objects in the pool.
+        """
+        with self.__lock:
+            while len(self.__handlers) > 0:
+                self.__handlers.popitem(last=False)[1].close()
+
+    def __len__(self):
+        return len(self.__handlers)
+
+
+__pool = None
+
+
+def __close_pool():
+    if __pool is not None:
+        __pool.close()
+
+
+atexit.register(__close_pool)
+# Open HDF5 files must not be shared with a forked child process.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=__close_pool)
+
+
+def enable_pool(max_size=32):
+    """
+        Keep up to max_size log files open for reuse by open_log.
+
+        :param max_size: Maximum number of log files to keep open.
+        :type max_size: int
+    """
+    global __pool
+
+    disable_pool()
+    __pool = LogHandlerPool(max_size)
+
+
+def disable_pool():
+    """
+        Close any log files kept open by enable_pool and stop pooling them.
+    """
+    global __pool
+
+    __close_pool()
+    __pool = None
+
+
+@contextmanager
+def open_log(filename, mode):
+    """
+        Open a log file, using the pool of open log files if enabled.
+
+        In append mode the skeleton of the log is created if it doesn't
+        exist yet.
+
+        :param filename: Log file to open.
+        :type filename: string
+        :param mode: 'r' to read or 'a' to append.
+        :type mode: string
+        :returns: LogHandler -- Handler for the log file.
+    """
+    if mode == "r" and not os.path.exists(filename):
+        raise IOError("Log file doesn't exist ({0})".format(filename))
+
+    pool = __pool
+    if pool is None:
+        handler_context = LogHandler(filename, mode)
+    else:
+        handler_context = pool.open(filename, mode)
+
+    with handler_context as handler:
+        if mode != "r" and "/data" not in handler.hdf5:
+            handler.create_skeleton()
+
+        yield handler
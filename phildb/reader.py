@@ -1,27 +1,240 @@
 import calendar
+from concurrent.futures import ThreadPoolExecutor
 from struct import unpack, calcsize
 import numpy as np
 import pandas as pd
 import os
 
+from phildb import chunked
 from phildb.constants import METADATA_MISSING_VALUE
-from phildb.log_handler import LogHandler
+from phildb.log_handler import open_log
 
+field_names = ["date", "value", "metaID"]
+entry_format = "<qdi"  # long, double, int; See field names above.
+entry_size = calcsize(entry_format)
+entry_dtype = np.dtype(
+    {"names": field_names, "formats": ["<i8", "<f8", "<i4"]}, align=False
+)
 
-def __read(filename):
-    field_names = ["date", "value", "metaID"]
-    entry_format = "<qdi"  # long, double, int; See field names above.
-    entry_size = calcsize(entry_format)
+default_chunk_records = 256 * 1024
+aggregates = ("count", "sum", "mean", "min", "max")
 
+
+def __to_datestamp(date):
+    """
+        Convert a date (anything pandas.Timestamp accepts) to seconds since epoch.
+    """
+    return pd.Timestamp(date).value // 1000000000
+
+
+def __regular_offset(freq, first_datestamp, datestamp, round_up):
+    """
+        Calculate the record offset of datestamp from the first record of a
+        regular frequency file.
+
+        Only fixed frequencies (e.g. minutes, hours, days) can be calculated
+        from the datestamps alone, None is returned for anything else
+        (e.g. months).
+
+        :param round_up: Round to the next record when datestamp falls
+            between records, otherwise round to the previous record.
+        :type round_up: bool
+        :returns: int -- Record offset or None.
+    """
+    try:
+        offset = pd.tseries.frequencies.to_offset(freq)
+    except ValueError:
+        return None
+
+    if not isinstance(offset, pd.tseries.offsets.Tick):
+        return None
+
+    step = offset.nanos // 1000000000
+    if step == 0:
+        return None
+
+    if round_up:
+        return -((first_datestamp - datestamp) // step)
+    else:
+        return (datestamp - first_datestamp) // step
+
+
+def __search_dates(records, datestamp, side="left"):
+    """
+        Binary search for datestamp in the date column of records.
+
+        Unlike numpy.searchsorted this does not make a contiguous copy of the
+        date column first, so only the pages of a memory mapped file that are
+        visited by the search are read from disk.
+
+        :param records: Records sorted by date.
+        :type records: numpy.ndarray
+        :param side: As for numpy.searchsorted, 'left' or 'right'.
+        :type side: string
+        :returns: int -- Index at which datestamp would be inserted.
+    """
+    low = 0
+    high = len(records)
+    while low < high:
+        middle = (low + high) // 2
+        date = records[middle]["date"]
+        if date < datestamp or (side == "right" and date == datestamp):
+            low = middle + 1
+        else:
+            high = middle
+
+    return low
+
+
+def __find_window(filename, num_records, start, end, freq):
+    """
+        Find the range of records, [first, last), that fall between start and end.
+
+        Either start or end (or both) may be None for an open ended window.
+
+        For regular fixed frequency data the offsets are calculated from the
+        first record, otherwise a binary search of the (memory mapped) date
+        column is used.
+    """
+    start_datestamp = None if start is None else __to_datestamp(start)
+    end_datestamp = None if end is None else __to_datestamp(end)
+
+    first = 0 if start_datestamp is None else None
+    last = num_records if end_datestamp is None else None
+
+    if freq is not None and freq != "IRR":
+        with open(filename, "rb") as reader:
+            first_datestamp = unpack(entry_format, reader.read(entry_size))[0]
+
+        if start_datestamp is not None:
+            first = __regular_offset(freq, first_datestamp, start_datestamp, True)
+        if end_datestamp is not None:
+            last = __regular_offset(freq, first_datestamp, end_datestamp, False)
+            if last is not None:
+                last += 1
+
+    if first is None or last is None:
+        records = np.memmap(filename, dtype=entry_dtype, mode="r", shape=num_records)
+        if first is None:
+            first = __search_dates(records, start_datestamp, side="left")
+        if last is None:
+            last = __search_dates(records, end_datestamp, side="right")
+        del records
+
+    first = min(max(int(first), 0), num_records)
+    last = min(max(int(last), first), num_records)
+
+    return first, last
+
+
+def __from_columns(dates, values, meta_ids):
+    """
+        Combine columns of dates, values and meta IDs into records.
+    """
+    records = np.empty(len(dates), dtype=entry_dtype)
+    records["date"] = dates
+    records["value"] = values
+    records["metaID"] = meta_ids
+
+    return records
+
+
+def __read_chunked_records(filename, start=None, end=None):
+    """
+        Read the raw records from a chunked format file, optionally
+        restricted to the records between start and end (inclusive).
+    """
+    start_datestamp = None if start is None else __to_datestamp(start)
+    end_datestamp = None if end is None else __to_datestamp(end)
+
+    return __from_columns(*chunked.read(filename, start_datestamp, end_datestamp))
+
+
+def __read_records(filename, start=None, end=None, freq=None):
+    """
+        Read the raw records from filename, optionally restricted to the
+        records between start and end (inclusive).
+    """
     if not os.path.exists(filename):
-        return pd.DataFrame(None, columns=["date", "value", "metaID"])
+        return np.empty(0, dtype=entry_dtype)
 
-    records = np.fromfile(
-        filename, dtype=np.dtype({"names": field_names, "formats": entry_format[1:]})
-    )
+    if chunked.is_chunked(filename):
+        return __read_chunked_records(filename, start, end)
+
+    num_records = os.path.getsize(filename) // entry_size
+
+    if num_records == 0 or (start is None and end is None):
+        return np.fromfile(filename, dtype=entry_dtype)
+
+    first, last = __find_window(filename, num_records, start, end, freq)
+
+    with open(filename, "rb") as reader:
+        reader.seek(first * entry_size, os.SEEK_SET)
+        records = np.fromfile(reader, dtype=entry_dtype, count=last - first)
 
+    return records
+
+
+def __iter_records(filename, chunk_records, start=None, end=None, freq=None):
+    """
+        Read the raw records from filename in blocks of at most
+        chunk_records records, optionally restricted to the records between
+        start and end (inclusive).
+
+        Only one block of records is held in memory at a time.
+    """
+    if chunk_records < 1:
+        raise ValueError("chunk_records must be at least 1")
+
+    if not os.path.exists(filename):
+        return
+
+    if chunked.is_chunked(filename):
+        start_datestamp = None if start is None else __to_datestamp(start)
+        end_datestamp = None if end is None else __to_datestamp(end)
+
+        # Regroup the decoded chunks into blocks of chunk_records records,
+        # concatenating the pending chunks once per block rather than once
+        # per chunk and carrying only the leftover records forward.
+        pending = []
+        pending_records = 0
+        for columns in chunked.iter_read(filename, start_datestamp, end_datestamp):
+            pending.append(__from_columns(*columns))
+            pending_records += len(columns[0])
+            if pending_records < chunk_records:
+                continue
+
+            records = np.concatenate(pending)
+            full = len(records) - len(records) % chunk_records
+            for offset in range(0, full, chunk_records):
+                yield records[offset : offset + chunk_records]
+
+            pending = [records[full:].copy()]
+            pending_records = len(records) - full
+
+        if pending_records > 0:
+            yield np.concatenate(pending)
+
+        return
+
+    num_records = os.path.getsize(filename) // entry_size
+
+    if num_records == 0:
+        return
+
+    first, last = __find_window(filename, num_records, start, end, freq)
+
+    with open(filename, "rb") as reader:
+        reader.seek(first * entry_size, os.SEEK_SET)
+        for offset in range(first, last, chunk_records):
+            yield np.fromfile(
+                reader, dtype=entry_dtype, count=min(chunk_records, last - offset)
+            )
+
+
+def __to_dataframe(records):
     if len(records) == 0:
-        return pd.DataFrame(None, columns=["date", "value", "metaID"])
+        return pd.DataFrame(None, columns=field_names)
 
     df = pd.DataFrame(records, columns=field_names)
     df["date"] = pd.to_datetime(df["date"], unit="s")
@@ -34,13 +247,443 @@ def __read(filename):
     return df
 
 
-def read(filename):
-    return __read(filename).value
+def __read(filename, start=None, end=None, freq=None):
+    return __to_dataframe(__read_records(filename, start, end, freq))
+
+
+def read(filename, start=None, end=None, freq=None):
+    """
+        Read timeseries data from a tsdb file.
+
+        When start and/or end are given only the requested window of records
+        is read from disk. Both the legacy and chunked file formats are
+        read.
+
+        :param filename: File to read timeseries data from.
+        :type filename: string
+        :param start: Only read records on or after this date. (Optional)
+        :type start: datetime
+        :param end: Only read records on or before this date. (Optional)
+        :type end: datetime
+        :param freq: Frequency of the data in the file. Used to calculate
+            record offsets directly rather than searching the file. (Optional)
+        :type freq: string
+        :returns: pandas.Series -- Timeseries data.
+    """
+    return __read(filename, start, end, freq).value
+
+
+def __aligned_dataframe(data, freq):
+    """
+        Assemble regular frequency series into a DataFrame by copying the
+        values of each series into a single pre-allocated array.
+
+        The row offset of each series is found from its first date, so
+        the indexes are never aligned against each other. Rows not
+        covered by any series are dropped to match pd.DataFrame(data).
+
+        :param data: Mapping of column name to timeseries.
+        :type data: dict
+        :returns: pandas.DataFrame -- Timeseries data or None if the
+            series aren't contiguous on the freq grid.
+    """
+    if freq == "IRR" or len(data) == 0:
+        return None
+
+    if any(len(ts) == 0 for ts in data.values()):
+        return None
+
+    try:
+        index = pd.date_range(
+            min(ts.index[0] for ts in data.values()),
+            max(ts.index[-1] for ts in data.values()),
+            freq=freq,
+            name="date",
+        )
+    except ValueError:
+        return None
+
+    values = np.empty((len(index), len(data)), dtype=np.float64)
+    values.fill(np.nan)
+    covered = np.zeros(len(index), dtype=bool)
+
+    for column, ts in enumerate(data.values()):
+        first = index.searchsorted(ts.index[0])
+        last = first + len(ts)
+        if (
+            last > len(index)
+            or index[first] != ts.index[0]
+            or index[last - 1] != ts.index[-1]
+        ):
+            return None
+
+        values[first:last, column] = ts.values
+        covered[first:last] = True
+
+    if not covered.all():
+        values = values[covered]
+        index = index[covered]
+
+    return pd.DataFrame(values, index=index, columns=list(data.keys()))
+
+
+def read_dataframe(filenames, columns, freq=None, workers=None):
+    """
+        Read timeseries data from tsdb files into the columns of a DataFrame.
+
+        :param filenames: Files to read timeseries data from.
+        :type filenames: array[string]
+        :param columns: Column name for the data of each file.
+        :type columns: array[string]
+        :param freq: Frequency of the data in the files. Regular frequency
+            data is assembled without aligning the indexes. (Optional)
+        :type freq: string
+        :param workers: Number of threads used to read the files, the
+            files are read sequentially if None. (Optional)
+        :type workers: int
+        :returns: pandas.DataFrame -- Timeseries data.
+    """
+    if workers is None:
+        series = [read(filename) for filename in filenames]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            series = list(executor.map(read, filenames))
+
+    data = dict(zip(columns, series))
+
+    df = __aligned_dataframe(data, freq)
+    if df is None:
+        return pd.DataFrame(data)
+
+    return df
+
+
+def __resample_records(records, target_freq, origin):
+    """
+        Partial count, sum, min and max of records in each target_freq bin.
+
+        Fixed frequency bins are measured from origin, so the bins of every
+        block of records read from a file line up.
+    """
+    valid = records["metaID"] != METADATA_MISSING_VALUE
+    values = pd.Series(
+        np.where(valid, records["value"], np.nan),
+        pd.to_datetime(records["date"], unit="s"),
+    )
+
+    offset = pd.tseries.frequencies.to_offset(target_freq)
+    if isinstance(offset, pd.tseries.offsets.Tick):
+        step = offset.nanos // 1000000000
+        labels = pd.to_datetime(
+            origin + (records["date"] - origin) // step * step, unit="s"
+        )
+        bins = values.groupby(labels)
+    else:
+        bins = values.resample(offset)
+
+    return bins.agg(["count", "sum", "min", "max"])
+
+
+def read_resampled(
+    filename,
+    target_freq,
+    how,
+    start=None,
+    end=None,
+    freq=None,
+    chunk_records=default_chunk_records,
+):
+    """
+        Read timeseries data from a tsdb file resampled to target_freq.
+
+        Equivalent to read(...).resample(target_freq).agg(how) but the file
+        is read in blocks of chunk_records records, so memory use depends
+        on the number of bins rather than the length of the record.
+
+        :param filename: File to read timeseries data from.
+        :type filename: string
+        :param target_freq: Frequency to resample to (e.g. 'D' for daily).
+        :type target_freq: string
+        :param how: One of 'count', 'sum', 'mean', 'min' or 'max'.
+        :type how: string
+        :param start: Only read records on or after this date. (Optional)
+        :type start: datetime
+        :param end: Only read records on or before this date. (Optional)
+        :type end: datetime
+        :param freq: Frequency of the data in the file. (Optional)
+        :type freq: string
+        :param chunk_records: Number of records read at a time.
+        :type chunk_records: int
+        :returns: pandas.Series -- Resampled timeseries data.
+    """
+    if how not in aggregates:
+        raise ValueError(
+            "Unknown aggregate '{0}', expected one of {1}".format(how, aggregates)
+        )
+
+    origin = None
+    partials = []
+    for records in __iter_records(filename, chunk_records, start, end, freq):
+        if origin is None:
+            # Bins start at midnight of the first day, as for Series.resample.
+            origin = records["date"][0] - records["date"][0] % 86400
+
+        partials.append(__resample_records(records, target_freq, origin))
+
+    if len(partials) == 0:
+        return pd.Series(
+            [],
+            index=pd.DatetimeIndex([], name="date"),
+            name="value",
+            dtype=np.int64 if how == "count" else np.float64,
+        )
+
+    totals = (
+        pd.concat(partials)
+        .groupby(level=0)
+        .agg({"count": "sum", "sum": "sum", "min": "min", "max": "max"})
+    )
+    totals = totals.reindex(
+        pd.date_range(totals.index.min(), totals.index.max(), freq=target_freq)
+    )
+    totals["count"] = totals["count"].fillna(0).astype(np.int64)
+    totals["sum"] = totals["sum"].fillna(0.0)
+
+    if how == "mean":
+        result = totals["sum"] / totals["count"]
+    else:
+        result = totals[how]
+
+    result.index.name = "date"
+    result.name = "value"
+
+    return result
+
+
+class MappedSeries(object):
+    """
+        Read only view of timeseries records backed by a numpy.memmap.
+
+        Nothing is copied out of the underlying file until the data is
+        materialised with to_series. Missing values are stored as
+        MISSING_VALUE in the values view, use the missing mask to find them.
+    """
+
+    def __init__(self, records):
+        self.records = records
+
+    @property
+    def dates(self):
+        """
+            Record dates as a numpy datetime64[s] view.
+        """
+        return self.records["date"].view("datetime64[s]")
+
+    @property
+    def values(self):
+        """
+            Record values as a numpy float64 view.
+        """
+        return self.records["value"]
+
+    @property
+    def meta_ids(self):
+        """
+            Record meta IDs as a numpy int32 view.
+        """
+        return self.records["metaID"]
+
+    @property
+    def missing(self):
+        """
+            Boolean mask of the missing records.
+        """
+        return self.records["metaID"] == METADATA_MISSING_VALUE
+
+    def to_series(self):
+        """
+            Materialise the records as a pandas.Series.
+
+            :returns: pandas.Series -- Timeseries data.
+        """
+        values = np.where(self.missing, np.nan, self.records["value"])
+        index = pd.DatetimeIndex(self.dates, name="date")
+
+        return pd.Series(values, index=index, name="value")
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return MappedSeries(self.records[key])
+
+        if self.records["metaID"][key] == METADATA_MISSING_VALUE:
+            return np.nan
+
+        return self.records["value"][key]
+
+    def __repr__(self):
+        return "<MappedSeries(length={0})>".format(len(self))
+
+
+def iter_chunks(
+    filename,
+    chunk_records=default_chunk_records,
+    start=None,
+    end=None,
+    freq=None,
+    as_series=True,
+):
+    """
+        Read timeseries data from a tsdb file in blocks of records.
+
+        The file is read sequentially and only one block of at most
+        chunk_records records is held in memory at a time, so files of any
+        length can be processed. Missing values are converted to NaN in
+        each block.
+
+        :param filename: File to read timeseries data from.
+        :type filename: string
+        :param chunk_records: Maximum number of records in each block.
+        :type chunk_records: int
+        :param start: Only read records on or after this date. (Optional)
+        :type start: datetime
+        :param end: Only read records on or before this date. (Optional)
+        :type end: datetime
+        :param freq: Frequency of the data in the file. (Optional)
+        :type freq: string
+        :param as_series: Yield each block as a pandas.Series, otherwise as
+            a (dates, values) tuple of numpy arrays. (Default=True)
+        :type as_series: bool
+        :returns: generator -- Blocks of timeseries data.
+    """
+    for records in __iter_records(filename, chunk_records, start, end, freq):
+        block = MappedSeries(records)
+
+        if as_series:
+            yield block.to_series()
+        else:
+            yield block.dates, np.where(block.missing, np.nan, block.values)
+
+
+def __read_latest_records(filename, n):
+    """
+        Read the last n raw records from filename.
+
+        Only the end of the file is read, the last chunks for a chunked
+        format file.
+    """
+    if not os.path.exists(filename):
+        return np.empty(0, dtype=entry_dtype)
+
+    # Check the format with the same open file as the records are read
+    # from, this is called often enough for the extra open to matter.
+    with open(filename, "rb") as reader:
+        if reader.read(len(chunked.magic)) != chunked.magic:
+            count = min(n, reader.seek(0, os.SEEK_END) // entry_size)
+            reader.seek(-count * entry_size, os.SEEK_END)
+
+            return np.fromfile(reader, dtype=entry_dtype, count=count)
+
+    chunk_records, chunks = chunked.read_index(filename)
+
+    count = 0
+    first_chunk = len(chunks)
+    while first_chunk > 0 and count < n:
+        first_chunk -= 1
+        count += chunks[first_chunk][1]
+
+    records = __from_columns(*chunked.read_chunks(filename, chunks[first_chunk:]))
+
+    return records[len(records) - min(n, len(records)) :]
+
+
+def read_latest(filename, n=1):
+    """
+        Read the last n records of a tsdb file.
+
+        The records are read with a single seek from the end of the file,
+        the rest of the file isn't read.
+
+        :param filename: File to read timeseries data from.
+        :type filename: string
+        :param n: Number of records to read. (Default=1)
+        :type n: int
+        :returns: pandas.Series -- Timeseries data.
+    """
+    if n < 1:
+        raise ValueError("n must be at least 1")
+
+    return MappedSeries(__read_latest_records(filename, n)).to_series()
+
+
+def read_mapped(filename, start=None, end=None, freq=None):
+    """
+        Read timeseries data from a tsdb file as a memory mapped view.
+
+        Unlike read no copy of the data is made, pages are only loaded from
+        disk as they are accessed. The file should not be written to while a
+        view of it is held. Chunked format files are compressed so can't be
+        mapped, their records are decoded into memory instead.
+
+        :param filename: File to read timeseries data from.
+        :type filename: string
+        :param start: Only read records on or after this date. (Optional)
+        :type start: datetime
+        :param end: Only read records on or before this date. (Optional)
+        :type end: datetime
+        :param freq: Frequency of the data in the file. (Optional)
+        :type freq: string
+        :returns: MappedSeries -- Lazy view of the timeseries data.
+    """
+    if not os.path.exists(filename):
+        return MappedSeries(np.empty(0, dtype=entry_dtype))
+
+    if chunked.is_chunked(filename):
+        return MappedSeries(__read_chunked_records(filename, start, end))
+
+    num_records = os.path.getsize(filename) // entry_size
+
+    if num_records == 0:
+        return MappedSeries(np.empty(0, dtype=entry_dtype))
+
+    first, last = __find_window(filename, num_records, start, end, freq)
+
+    if first == last:
+        return MappedSeries(np.empty(0, dtype=entry_dtype))
+
+    records = np.memmap(
+        filename,
+        dtype=entry_dtype,
+        mode="r",
+        offset=first * entry_size,
+        shape=last - first,
+    )
+
+    return MappedSeries(records)
+
 
+def read_log(log_file, as_at_datetime, start=None, end=None):
+    """
+        Read timeseries data as it was at as_at_datetime from a log file.
 
-def read_log(log_file, as_at_datetime):
+        :param log_file: Log file to read timeseries data from.
+        :type log_file: string
+        :param as_at_datetime: Read the timeseries as it was at this datetime.
+        :type as_at_datetime: datetime
+        :param start: Only read data on or after this date. (Optional)
+        :type start: datetime
+        :param end: Only read data on or before this date. (Optional)
+        :type end: datetime
+        :returns: pandas.Series -- Timeseries data.
+    """
+    if start is not None:
+        start = __to_datestamp(start)
+    if end is not None:
+        end = __to_datestamp(end)
 
-    with LogHandler(log_file, "r") as reader:
-        df = reader.read(calendar.timegm(as_at_datetime.utctimetuple()))
+    with open_log(log_file, "r") as reader:
+        df = reader.read(calendar.timegm(as_at_datetime.utctimetuple()), start, end)
 
     return df.value
@@ -0,0 +1,414 @@
+"""
+    Summary index of a data file.
+
+    The records of a data file are split into fixed size blocks of
+    block_records records, the last block holding whatever remains. For each
+    block the summary holds the first and last date, the number of records,
+    the number of non-missing records and the sum, minimum and maximum of
+    the non-missing values.
+
+    Aggregates over a date range are answered from the summaries of the
+    blocks that fall entirely within a single period, only the records of
+    blocks straddling a period boundary (or the ends of the range) are read.
+
+    The summary is stored alongside the data file with a .summary extension
+    and kept up to date by writer.write, which re-summarises only the blocks
+    holding changed records, or every block from the first changed record
+    onwards when records are inserted before existing ones. Data files
+    without a summary are aggregated by reading all of their records, they
+    are summarised by their next write or by PhilDB.index_summaries.
+"""
+import os
+from struct import pack, unpack, calcsize
+
+import numpy as np
+import pandas as pd
+
+from phildb import chunked
+from phildb.constants import METADATA_MISSING_VALUE
+from phildb.reader import __iter_records, __to_datestamp
+from phildb.reader import aggregates, default_chunk_records, entry_size
+
+format_version = 1
+header_format = "<II"  # format version, records per block
+header_size = calcsize(header_format)
+
+summary_dtype = np.dtype(
+    {
+        "names": ["first", "last", "count", "valid", "sum", "min", "max"],
+        "formats": ["<i8", "<i8", "<i8", "<i8", "<f8", "<f8", "<f8"],
+    },
+    align=False,
+)
+
+default_block_records = 1024
+
+
+def summary_file(tsdb_file):
+    """
+        Get the path of the summary of a data file.
+
+        :param tsdb_file: Data file.
+        :type tsdb_file: string
+        :returns: string -- Path of the summary file.
+    """
+    return os.path.splitext(tsdb_file)[0] + ".summary"
+
+
+def __summarise(records, block_records):
+    """
+        Summarise records in blocks of block_records records.
+
+        :returns: numpy.ndarray -- Summary of each block.
+    """
+    num_records = len(records)
+    blocks = np.empty(-(-num_records // block_records), dtype=summary_dtype)
+
+    if num_records == 0:
+        return blocks
+
+    starts = np.arange(0, num_records, block_records)
+    valid = records["metaID"] != METADATA_MISSING_VALUE
+    values = records["value"]
+
+    blocks["first"] = records["date"][starts]
+    blocks["last"] = records["date"][
+        np.minimum(starts + block_records, num_records) - 1
+    ]
+    blocks["count"] = np.diff(np.append(starts, num_records))
+    blocks["valid"] = np.add.reduceat(valid.astype(np.int64), starts)
+    blocks["sum"] = np.add.reduceat(np.where(valid, values, 0.0), starts)
+    blocks["min"] = np.minimum.reduceat(np.where(valid, values, np.inf), starts)
+    blocks["max"] = np.maximum.reduceat(np.where(valid, values, -np.inf), starts)
+
+    empty = blocks["valid"] == 0
+    blocks["min"][empty] = np.nan
+    blocks["max"][empty] = np.nan
+
+    return blocks
+
+
+def read_blocks(filename):
+    """
+        Read a summary file.
+
+        :param filename: Summary file to read.
+        :type filename: string
+        :returns: tuple -- (block_records, blocks) where blocks is an array
+            of summary_dtype.
+    """
+    with open(filename, "rb") as reader:
+        version, block_records = unpack(header_format, reader.read(header_size))
+
+        if version != format_version:
+            raise IOError("Unsupported summary format version: {0}".format(version))
+
+        blocks = np.fromfile(reader, dtype=summary_dtype)
+
+    return block_records, blocks
+
+
+def __num_records(tsdb_file):
+    """
+        Number of records in a data file, from its size or chunk headers.
+    """
+    if chunked.is_chunked(tsdb_file):
+        chunk_records, chunks = chunked.read_index(tsdb_file)
+        return sum(records for offset, records, first, last in chunks)
+
+    return os.path.getsize(tsdb_file) // entry_size
+
+
+def __summarise_pieces(pieces, block_records):
+    """
+        Summarise consecutive pieces of records, each piece except the last
+        holding a whole number of blocks.
+
+        :returns: numpy.ndarray -- Summary of each block.
+    """
+    blocks = [__summarise(records, block_records) for records in pieces]
+
+    if len(blocks) == 0:
+        return np.empty(0, dtype=summary_dtype)
+
+    return np.concatenate(blocks)
+
+
+def __piece_records(block_records):
+    """
+        Number of records summarised at a time, a whole number of blocks.
+    """
+    return block_records * max(1, default_chunk_records // block_records)
+
+
+def __summarise_file(tsdb_file, block_records, start=None, end=None):
+    """
+        Summarise the records of a data file between start and end
+        (inclusive), start being the first date of a block.
+
+        The records are streamed from the file, only a limited number are
+        held in memory at a time.
+    """
+    return __summarise_pieces(
+        __iter_records(tsdb_file, __piece_records(block_records), start, end),
+        block_records,
+    )
+
+
+def __block_date(blocks, block, column):
+    """
+        The first or last date of a block as a pandas.Timestamp.
+    """
+    return pd.Timestamp(blocks[column][block], unit="s")
+
+
+def create(tsdb_file, records=None, block_records=default_block_records):
+    """
+        Summarise the whole of a data file.
+
+        :param tsdb_file: Data file to summarise.
+        :type tsdb_file: string
+        :param records: All the records of the data file, when they are
+            already in memory, to save reading them back. (Optional)
+        :type records: numpy.ndarray
+        :param block_records: Records per block.
+        :type block_records: int
+    """
+    if records is None:
+        blocks = __summarise_file(tsdb_file, block_records)
+    else:
+        step = __piece_records(block_records)
+        blocks = __summarise_pieces(
+            (records[i : i + step] for i in range(0, len(records), step)), block_records
+        )
+
+    with open(summary_file(tsdb_file), "wb") as writer:
+        writer.write(pack(header_format, format_version, block_records))
+        blocks.tofile(writer)
+
+
+def update(tsdb_file, changed=None, block_records=default_block_records):
+    """
+        Update the summary of a data file after the records at the changed
+        datestamps were written.
+
+        When no existing record has moved in the file only the blocks
+        containing changed records, and any appended records, are
+        re-summarised. Otherwise records were inserted (e.g. a prepend) and
+        every block from the one containing the first changed record
+        onwards is re-summarised. The whole file is summarised if changed
+        is None or there is no existing summary.
+
+        :param tsdb_file: Data file to summarise.
+        :type tsdb_file: string
+        :param changed: Datestamps of the changed records. (Optional)
+        :type changed: numpy.ndarray
+        :param block_records: Records per block of a new summary.
+        :type block_records: int
+    """
+    filename = summary_file(tsdb_file)
+
+    if changed is None or not os.path.exists(filename):
+        create(tsdb_file, block_records=block_records)
+        return
+
+    block_records, blocks = read_blocks(filename)
+    changed = np.unique(changed)
+
+    if len(blocks) == 0:
+        in_place = np.empty(0, dtype=np.int64)
+        tail_block = 0
+    else:
+        # Changed records past the last summarised record can only have
+        # been appended. If that accounts for every new record then no
+        # record was inserted before an existing one, so none have moved.
+        appended = changed > blocks["last"][-1]
+        if __num_records(tsdb_file) == blocks["count"].sum() + appended.sum():
+            in_place = np.unique(
+                np.searchsorted(blocks["first"], changed[~appended], side="right") - 1
+            )
+            tail_block = len(blocks) - 1 if appended.any() else len(blocks)
+            in_place = in_place[(in_place >= 0) & (in_place < tail_block)]
+        else:
+            in_place = np.empty(0, dtype=np.int64)
+            tail_block = max(
+                np.searchsorted(blocks["first"], changed[0], side="right") - 1, 0
+            )
+
+    with open(filename, "r+b") as writer:
+        # Each run of consecutive changed blocks is re-summarised together.
+        runs = np.split(in_place, np.flatnonzero(np.diff(in_place) != 1) + 1)
+        for run in runs:
+            if len(run) == 0:
+                continue
+
+            run_blocks = __summarise_file(
+                tsdb_file,
+                block_records,
+                __block_date(blocks, run[0], "first"),
+                __block_date(blocks, run[-1], "last"),
+            )
+            writer.seek(header_size + run[0] * summary_dtype.itemsize, os.SEEK_SET)
+            run_blocks.tofile(writer)
+
+        if tail_block < len(blocks) or len(blocks) == 0:
+            # Changes before the first block (e.g. a prepend) move every
+            # record, so the whole file is re-summarised.
+            if tail_block > 0:
+                start = __block_date(blocks, tail_block, "first")
+            else:
+                start = None
+
+            tail_blocks = __summarise_file(tsdb_file, block_records, start)
+            writer.seek(header_size + tail_block * summary_dtype.itemsize, os.SEEK_SET)
+            tail_blocks.tofile(writer)
+            writer.truncate()
+
+
+def __aggregate_records(records, period):
+    """
+        Partial aggregates of records by period.
+    """
+    valid = records["metaID"] != METADATA_MISSING_VALUE
+    values = np.where(valid, records["value"], np.nan)
+
+    return (
+        pd.DataFrame(
+            {
+                "period": pd.to_datetime(records["date"], unit="s").to_period(period),
+                "valid": valid.astype(np.int64),
+                "sum": np.where(valid, values, 0.0),
+                "min": values,
+                "max": values,
+            }
+        )
+        .groupby("period", as_index=False)
+        .agg({"valid": "sum", "sum": "sum", "min": "min", "max": "max"})
+    )
+
+
+def __summary_parts(tsdb_file, period, start, end):
+    """
+        Partial aggregates by period from the summaries of the blocks that
+        fall entirely within a single period and the requested window.
+
+        :returns: tuple -- (parts, windows) where parts is a list of partial
+            aggregates and windows the (start, end) of each run of blocks
+            whose records need to be read.
+    """
+    block_records, blocks = read_blocks(summary_file(tsdb_file))
+
+    start_datestamp = -np.inf if start is None else __to_datestamp(start)
+    end_datestamp = np.inf if end is None else __to_datestamp(end)
+
+    blocks = blocks[
+        (blocks["last"] >= start_datestamp) & (blocks["first"] <= end_datestamp)
+    ]
+
+    first_periods = pd.to_datetime(blocks["first"], unit="s").to_period(period)
+    last_periods = pd.to_datetime(blocks["last"], unit="s").to_period(period)
+
+    whole = (
+        (first_periods == last_periods)
+        & (blocks["first"] >= start_datestamp)
+        & (blocks["last"] <= end_datestamp)
+    )
+
+    parts = [
+        pd.DataFrame(
+            {
+                "period": first_periods[whole],
+                "valid": blocks["valid"][whole],
+                "sum": blocks["sum"][whole],
+                "min": blocks["min"][whole],
+                "max": blocks["max"][whole],
+            }
+        )
+    ]
+
+    # The records of each run of consecutive partial blocks are read
+    # together, a limited number of records at a time.
+    partial = np.flatnonzero(~whole)
+    runs = np.split(partial, np.flatnonzero(np.diff(partial) != 1) + 1)
+    windows = [
+        (
+            pd.Timestamp(max(blocks["first"][run[0]], start_datestamp), unit="s"),
+            pd.Timestamp(min(blocks["last"][run[-1]], end_datestamp), unit="s"),
+        )
+        for run in runs
+        if len(run) > 0
+    ]
+
+    return parts, windows
+
+
+def aggregate(tsdb_file, how, period, start=None, end=None):
+    """
+        Aggregate the records of a data file by period.
+
+        Equivalent to resampling the series read from tsdb_file to period,
+        missing values are ignored.
+
+        :param tsdb_file: Data file to aggregate.
+        :type tsdb_file: string
+        :param how: One of 'count', 'sum', 'mean', 'min' or 'max'.
+        :type how: string
+        :param period: Period to aggregate to (e.g. 'M' for monthly, 'A' for annual).
+        :type period: string
+        :param start: Only aggregate records on or after this date. (Optional)
+        :type start: datetime
+        :param end: Only aggregate records on or before this date. (Optional)
+        :type end: datetime
+        :returns: pandas.Series -- Aggregate of each period.
+    """
+    if how not in aggregates:
+        raise ValueError(
+            "Unknown aggregate '{0}', expected one of {1}".format(how, aggregates)
+        )
+
+    if os.path.exists(summary_file(tsdb_file)):
+        parts, windows = __summary_parts(tsdb_file, period, start, end)
+    else:
+        # Without a summary every record in the window is read.
+        parts = []
+        windows = [(start, end)]
+
+    for window_start, window_end in windows:
+        for records in __iter_records(
+            tsdb_file, default_chunk_records, window_start, window_end
+        ):
+            parts.append(__aggregate_records(records, period))
+
+    if len(parts) == 0:
+        partials = pd.DataFrame(columns=["period", "valid", "sum", "min", "max"])
+    else:
+        partials = pd.concat(parts)
+
+    if len(partials) == 0:
+        return pd.Series(
+            [],
+            index=pd.PeriodIndex([], freq=period, name="date"),
+            name="value",
+            dtype=np.int64 if how == "count" else np.float64,
+        )
+
+    totals = partials.groupby("period").agg(
+        {"valid": "sum", "sum": "sum", "min": "min", "max": "max"}
+    )
+    totals = totals.reindex(
+        pd.period_range(totals.index.min(), totals.index.max(), freq=period)
+    )
+    totals["valid"] = totals["valid"].fillna(0).astype(np.int64)
+    totals["sum"] = totals["sum"].fillna(0.0)
+
+    if how == "count":
+        result = totals["valid"]
+    elif how == "mean":
+        result = totals["sum"] / totals["valid"]
+    else:
+        result = totals[how]
+
+    result.index.name = "date"
+    result.name = "value"
+
+    return result
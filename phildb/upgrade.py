@@ -0,0 +1,79 @@
+import argparse
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+Session = sessionmaker()
+
+from phildb import constants
+from phildb import dbstructures
+from phildb.exceptions import SchemaVersionError
+
+
+def __create_instance_indexes(engine):
+    """
+        Create the secondary indexes on timeseries_instance added in 0.0.7.
+    """
+    for index in dbstructures.TimeseriesInstance.__table__.indexes:
+        index.create(engine, checkfirst=True)
+
+
+# Schema version to upgrade from: (schema version upgraded to, upgrade function)
+upgrades = {"0.0.6": ("0.0.7", __create_instance_indexes)}
+
+
+def upgrade(tsdb_path):
+    """
+        Upgrade the meta-database of an existing PhilDB database to the
+        current schema version.
+
+        :param tsdb_path: Path to the PhilDB database to upgrade.
+        :type tsdb_path: string
+        :returns: string -- Schema version the database was upgraded from.
+        :raises: SchemaVersionError
+    """
+    meta_data_db = os.path.join(tsdb_path, constants.METADATA_DB)
+    if not os.path.exists(meta_data_db):
+        raise IOError(
+            "PhilDB database doesn't contain meta-database ({0})".format(meta_data_db)
+        )
+
+    engine = create_engine("sqlite:///{0}".format(meta_data_db))
+    Session.configure(bind=engine)
+    session = Session()
+
+    try:
+        schema_version = session.query(dbstructures.SchemaVersion).one()
+        original_version = schema_version.version
+
+        while schema_version.version != constants.DB_VERSION:
+            if schema_version.version not in upgrades:
+                raise SchemaVersionError(
+                    "Can't upgrade schema version {0} to {1}".format(
+                        schema_version.version, constants.DB_VERSION
+                    )
+                )
+
+            version, upgrade_schema = upgrades[schema_version.version]
+            upgrade_schema(engine)
+            schema_version.version = version
+            session.commit()
+    finally:
+        session.close()
+        engine.dispose()
+
+    return original_version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upgrade PhilDB database.")
+    parser.add_argument("dbname", help="PhilDB database to upgrade")
+
+    args = parser.parse_args()
+
+    upgrade(args.dbname)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,28 @@
 import calendar
+import itertools
 from datetime import datetime as dt, timedelta
 from dateutil.relativedelta import relativedelta
 import numpy as np
 import os
 import pandas as pd
+import shutil
 from struct import pack, unpack, calcsize
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+from phildb import chunked
+from phildb import summary
 from phildb.constants import DEFAULT_META_ID, MISSING_VALUE, METADATA_MISSING_VALUE
-from phildb.log_handler import LogHandler
+from phildb.log_handler import log_entry_dtype, open_log
 from phildb.exceptions import DataError
-from phildb.reader import __read, read
+from phildb.reader import __from_columns, __read, __search_dates, read, entry_dtype
 
 field_names = ["date", "value", "metaID"]
 entry_format = "<qdi"  # long, double, int; See field names above.
 entry_size = calcsize(entry_format)
+copy_buffer_size = 16 * 1024 * 1024
 
 
 def __pack(record_date, value, default_flag=DEFAULT_META_ID):
@@ -30,6 +35,121 @@ def __pack(record_date, value, default_flag=DEFAULT_META_ID):
     return data
 
 
+def __datestamps(index):
+    """
+        Convert a datetime index into seconds since epoch.
+
+        :param index: Dates to convert.
+        :type index: pandas.DatetimeIndex
+        :returns: numpy.ndarray -- Array of int64 datestamps.
+    """
+    return pd.DatetimeIndex(index).asi8 // 1000000000
+
+
+def __to_records(datestamps, values):
+    """
+        Build a structured array of records, ready to be written to disk,
+        from arrays of datestamps and values.
+
+        Equivalent to calling __pack on each datestamp and value pair.
+    """
+    records = np.empty(len(datestamps), dtype=entry_dtype)
+    records["date"] = datestamps
+    records["value"] = values
+    records["metaID"] = DEFAULT_META_ID
+
+    missing = np.isnan(records["value"])
+    records["value"][missing] = MISSING_VALUE
+    records["metaID"][missing] = METADATA_MISSING_VALUE
+
+    return records
+
+
+def __new_log_entries():
+    """
+        Create an empty set of created ('C') and updated ('U') log entries.
+    """
+    return {
+        "C": np.empty(0, dtype=log_entry_dtype),
+        "U": np.empty(0, dtype=log_entry_dtype),
+    }
+
+
+def __add_log_entries(log_entries, kind, datestamps, values, meta_ids):
+    """
+        Append entries to the created ('C') or updated ('U') log entries.
+
+        :param log_entries: Log entries to append to.
+        :type log_entries: dict
+        :param kind: Either 'C' or 'U'.
+        :type kind: string
+        :returns: dict -- The log entries with the new entries appended.
+    """
+    entries = np.empty(len(datestamps), dtype=log_entry_dtype)
+    entries["time"] = datestamps
+    entries["value"] = values
+    entries["meta"] = meta_ids
+
+    log_entries[kind] = np.concatenate((log_entries[kind], entries))
+
+    return log_entries
+
+
+def __write_series(writer, series, log_entries):
+    """
+        Write all values of series to writer, as new records, in a single write.
+
+        :param writer: Open file to write the records to.
+        :type writer: file
+        :param series: Pandas Series of data to write.
+        :type series: pandas.Series
+        :param log_entries: Log entries to record the created records in.
+        :type log_entries: dict
+    """
+    datestamps = __datestamps(series.index)
+    __to_records(datestamps, series.values).tofile(writer)
+
+    return __add_log_entries(
+        log_entries, "C", datestamps, series.values, DEFAULT_META_ID
+    )
+
+
+def __copy_data(source, destination):
+    """
+        Copy the remaining contents of source onto the end of destination.
+
+        Uses os.copy_file_range (an in kernel copy) where available, falling
+        back to a buffered copy in large chunks.
+
+        :param source: File opened for reading in binary mode.
+        :type source: file
+        :param destination: File opened for writing in binary (non-append) mode.
+        :type destination: file
+    """
+    destination.flush()
+
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        try:
+            while True:
+                count = os.copy_file_range(
+                    source.fileno(), destination.fileno(), copy_buffer_size
+                )
+                if count == 0:
+                    break
+                copied += count
+        except OSError:
+            # Not supported between these files, fall back to a buffered
+            # copy unless the copy has already started.
+            if copied > 0:
+                raise
+        else:
+            destination.seek(0, os.SEEK_END)
+            return
+
+    shutil.copyfileobj(source, destination, copy_buffer_size)
+
+
 def __convert_and_validate(ts, freq):
     """
         Enforces frequency.
@@ -71,15 +191,29 @@ def __write_missing(writer, freq, first_date, last_date, log_entries):
     log_entries = log_entries.copy()
 
     missing_dates = pd.date_range(first_date, last_date, freq=freq)
-    for the_date in missing_dates:
-        datestamp = calendar.timegm(the_date.utctimetuple())
-        log_entries["C"].append((datestamp, MISSING_VALUE, METADATA_MISSING_VALUE))
 
-        data = pack(entry_format, datestamp, MISSING_VALUE, METADATA_MISSING_VALUE)
+    # Write the whole gap as a single block of missing records
+    records = __to_records(
+        __datestamps(missing_dates), np.full(len(missing_dates), np.nan)
+    )
+    records.tofile(writer)
 
-        writer.write(data)
+    return __add_log_entries(
+        log_entries, "C", records["date"], records["value"], records["metaID"]
+    )
 
-    return log_entries
+
+def __runs(mask):
+    """
+        Find the runs of True values in a boolean mask.
+
+        :param mask: Boolean array.
+        :type mask: numpy.ndarray
+        :returns: list -- (start, end) index pairs of each run.
+    """
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+
+    return list(zip(edges[::2], edges[1::2]))
 
 
 def __update_existing_data(tsdb_file, series, log_entries):
@@ -94,45 +228,40 @@ def __update_existing_data(tsdb_file, series, log_entries):
         series.index.freqstr, series.index[0], first_record_date
     )
 
-    with open(tsdb_file, "r+b") as writer:
-        existing_records = []
+    datestamps = __datestamps(series.index)
+    values = series.values
+    records = __to_records(datestamps, values)
 
+    with open(tsdb_file, "r+b") as writer:
         # Read existing overlapping data for comparisons
         writer.seek(entry_size * offset, os.SEEK_SET)
-
-        for record in iter(lambda: writer.read(entry_size), ""):
-            if not record:
-                break
-            existing_records.append(unpack(entry_format, record))
-
+        existing_records = np.fromfile(writer, dtype=entry_dtype, count=len(series))
         records_length = len(existing_records)
 
-        # Start a count for records from the starting write position
-        rec_count = 0
-        writer.seek(entry_size * offset, os.SEEK_SET)
-        for date, value in zip(series.index, series.values):
-            datestamp = calendar.timegm(date.utctimetuple())
-            overlapping = rec_count <= records_length - 1
-
-            if overlapping and (
-                existing_records[rec_count][1] == value
-                or existing_records[rec_count][2] == MISSING_VALUE
-            ):
-                # Skip writing the entry if it hasn't changed.
-                writer.seek(
-                    entry_size * (rec_count + 1) + (entry_size * offset), os.SEEK_SET
-                )
-            elif overlapping and existing_records[rec_count][1] != value:
-                log_entries["U"].append(existing_records[rec_count])
+        # Entries past the end of the existing data are always written,
+        # overlapping entries are only written if they have changed.
+        changed = np.ones(len(series), dtype=bool)
+        changed[:records_length] = ~(
+            (existing_records["value"] == values[:records_length])
+            | (existing_records["metaID"] == MISSING_VALUE)
+        )
 
-                log_entries["C"].append((datestamp, value, DEFAULT_META_ID))
-                data = __pack(datestamp, value)
-                writer.write(data)
-            else:
-                data = __pack(datestamp, value)
-                log_entries["C"].append((datestamp, value, DEFAULT_META_ID))
-                writer.write(data)
-            rec_count += 1
+        updated_records = existing_records[changed[:records_length]]
+        log_entries = __add_log_entries(
+            log_entries,
+            "U",
+            updated_records["date"],
+            updated_records["value"],
+            updated_records["metaID"],
+        )
+        log_entries = __add_log_entries(
+            log_entries, "C", datestamps[changed], values[changed], DEFAULT_META_ID
+        )
+
+        # Write each run of changed entries as a single contiguous block
+        for run_start, run_end in __runs(changed):
+            writer.seek(entry_size * (offset + run_start), os.SEEK_SET)
+            records[run_start:run_end].tofile(writer)
 
     return log_entries
 
@@ -142,7 +271,10 @@ def write(tsdb_file, ts, freq):
         Smart write.
 
         Will only update existing values where they have changed.
-        Changed existing values are returned in a list.
+        Changed existing values are returned in a structured array.
+        Legacy and chunked format files are both supported, new files are
+        created in the legacy format. The summary index of the file is
+        updated to match.
 
         :param tsdb_file: File to write timeseries data into.
         :type tsdb_file: string
@@ -155,28 +287,99 @@ def write(tsdb_file, ts, freq):
 
     series = __convert_and_validate(ts, freq)
 
-    log_entries = {"C": [], "U": []}
+    log_entries = __new_log_entries()
 
     if len(series) == 0:
         return log_entries
 
-    # If the file didn't exist it is a straight foward write and we can
-    # just return at the end of this if block.
-    if not os.path.isfile(tsdb_file):
-        with open(tsdb_file, "wb") as writer:
-            for date, value in zip(series.index, series.values):
-                datestamp = calendar.timegm(date.utctimetuple())
-                log_entries["C"].append((datestamp, value, DEFAULT_META_ID))
-                data = __pack(datestamp, value)
-                writer.write(data)
+    new_file = not os.path.isfile(tsdb_file)
 
-        return log_entries
+    if chunked.is_chunked(tsdb_file):
+        log_entries = __write_chunked(tsdb_file, series, freq)
 
-    # If we reached here it wasn't a straight write to a new file.
-    if freq == "IRR":
-        return write_irregular_data(tsdb_file, series)
+    # If the file didn't exist it is a straight foward write.
+    elif new_file:
+        records = __to_records(__datestamps(series.index), series.values)
+        records.tofile(tsdb_file)
+        log_entries = __add_log_entries(
+            log_entries, "C", records["date"], series.values, DEFAULT_META_ID
+        )
+
+    elif freq == "IRR":
+        log_entries = write_irregular_data(tsdb_file, series)
     else:
-        return write_regular_data(tsdb_file, series)
+        log_entries = write_regular_data(tsdb_file, series)
+
+    # Every changed record has a created log entry, so an existing summary
+    # only needs updating where they are.
+    if new_file:
+        summary.create(tsdb_file, records)
+    elif len(log_entries["C"]) > 0:
+        summary.update(tsdb_file, log_entries["C"]["time"])
+
+    return log_entries
+
+
+def __write_chunked(tsdb_file, series, freq):
+    """
+        Write into a chunked format file.
+
+        Only the chunks from the one containing the first date of series to
+        the one containing its last date are decoded, into a temporary
+        legacy format file which is updated as usual. When that leaves the
+        number of records in those chunks unchanged (or they are the last
+        chunks) only they are re-encoded, the later chunks are kept as they
+        are. Otherwise records were inserted, moving every later record, so
+        the later chunks are re-encoded too, one at a time.
+    """
+    chunk_records, chunks = chunked.read_index(tsdb_file)
+
+    first_datestamp, last_datestamp = __datestamps(series.index[[0, -1]])
+    first_chunk = 0
+    last_chunk = 0
+    for i, (offset, records, first, last) in enumerate(chunks):
+        if first <= first_datestamp:
+            first_chunk = i
+        if first <= last_datestamp:
+            last_chunk = i
+
+    window = chunks[first_chunk : last_chunk + 1]
+
+    decoded_file = tsdb_file + ".decoded"
+    try:
+        records = __from_columns(*chunked.read_chunks(tsdb_file, window))
+
+        if len(records) == 0:
+            with open(decoded_file, "wb") as writer:
+                log_entries = __write_series(writer, series, __new_log_entries())
+        else:
+            records.tofile(decoded_file)
+            if freq == "IRR":
+                log_entries = write_irregular_data(decoded_file, series)
+            else:
+                log_entries = write_regular_data(decoded_file, series)
+
+        records = np.fromfile(decoded_file, dtype=entry_dtype)
+    finally:
+        if os.path.exists(decoded_file):
+            os.remove(decoded_file)
+
+    columns = (records["date"], records["value"], records["metaID"])
+    window_records = sum(chunk[1] for chunk in window)
+
+    if len(records) == window_records or last_chunk + 1 >= len(chunks):
+        chunked.replace(tsdb_file, first_chunk, last_chunk + 1, [columns])
+    else:
+        chunked.replace(
+            tsdb_file,
+            first_chunk,
+            None,
+            itertools.chain(
+                [columns], chunked.iter_chunks(tsdb_file, chunks[last_chunk + 1 :])
+            ),
+        )
+
+    return log_entries
 
 
 def write_regular_data(tsdb_file, series):
@@ -184,7 +387,7 @@ def write_regular_data(tsdb_file, series):
         Smart write. Expects continuous time series.
 
         Will only update existing values where they have changed.
-        Changed existing values are returned in a list.
+        Changed existing values are returned in a structured array.
 
         :param tsdb_file: File to write timeseries data into.
         :type tsdb_file: string
@@ -194,7 +397,7 @@ def write_regular_data(tsdb_file, series):
     start_date = series.index[0]
     end_date = series.index[-1]
 
-    log_entries = {"C": [], "U": []}
+    log_entries = __new_log_entries()
     with open(tsdb_file, "rb") as reader:
         first_record = unpack(entry_format, reader.read(entry_size))
         reader.seek(entry_size * -1, os.SEEK_END)
@@ -211,41 +414,37 @@ def write_regular_data(tsdb_file, series):
 
     # We are prepending to existing data
     if start_date < first_record_date:
-        # Keep original data before writing (since a new file needs to be
-        # written for a prepend operation)
-        os.rename(tsdb_file, tsdb_file + ".tmp")
-
-        # Write all the data up to the original first_record_date
-        with open(tsdb_file, "wb") as writer:
-            for date, value in zip(
-                series.loc[: first_record_date - series.index.freq].index,
-                series.loc[: first_record_date - series.index.freq].values,
-            ):
-                datestamp = calendar.timegm(date.utctimetuple())
-                log_entries["C"].append((datestamp, value, DEFAULT_META_ID))
-                data = __pack(datestamp, value)
-                writer.write(data)
-
-        # Fill any missing values between the end of the new series and the start of the old
-        with open(tsdb_file, "ab") as writer:
-            log_entries = __write_missing(
-                writer,
-                series.index.freq,
-                end_date + series.index.freq,
-                pd.Timestamp(first_record_date, freq=series.index.freq)
-                - series.index.freq,
-                log_entries,
-            )
+        # A new file needs to be written for a prepend operation, so write
+        # it alongside the original and only replace the original once the
+        # new file is complete.
+        prepend_file = tsdb_file + ".tmp"
+        try:
+            with open(prepend_file, "wb") as writer:
+                # Write all the data up to the original first_record_date
+                log_entries = __write_series(
+                    writer,
+                    series.loc[: first_record_date - series.index.freq],
+                    log_entries,
+                )
 
-        # Copy over existing data
-        with open(tsdb_file + ".tmp", "rb") as original_data, open(
-            tsdb_file, "ab"
-        ) as writer:
-            for chunk in iter(lambda: original_data.read(entry_size), b""):
-                writer.write(chunk)
+                # Fill any missing values between the end of the new series and the start of the old
+                log_entries = __write_missing(
+                    writer,
+                    series.index.freq,
+                    end_date + series.index.freq,
+                    pd.Timestamp(first_record_date, freq=series.index.freq)
+                    - series.index.freq,
+                    log_entries,
+                )
+
+                # Copy over existing data
+                with open(tsdb_file, "rb") as original_data:
+                    __copy_data(original_data, writer)
+        except Exception:
+            os.remove(prepend_file)
+            raise
 
-        # Remove temporary file now that its contents has been copied
-        os.remove(tsdb_file + ".tmp")
+        os.replace(prepend_file, tsdb_file)
 
         # Update existing data
         if len(series.loc[first_record_date:]) > 0:
@@ -273,11 +472,7 @@ def write_regular_data(tsdb_file, series):
                 log_entries,
             )
 
-            for date, value in zip(series.index, series.values):
-                datestamp = calendar.timegm(date.utctimetuple())
-                log_entries["C"].append((datestamp, value, DEFAULT_META_ID))
-                data = __pack(datestamp, value)
-                writer.write(data)
+            log_entries = __write_series(writer, series, log_entries)
 
     else:  # Not yet supported
         raise NotImplementedError
@@ -290,7 +485,11 @@ def write_irregular_data(tsdb_file, series):
         Smart write of irregular data.
 
         Will only update existing values where they have changed.
-        Changed existing values are returned in a list.
+        Changed existing values are returned in a structured array.
+
+        The existing records are binary searched for the incoming dates, so
+        only the records from the first inserted date onwards are rewritten
+        (nothing is rewritten for updates of existing dates or appends).
 
         :param tsdb_file: File to write timeseries data into.
         :type tsdb_file: string
@@ -298,95 +497,161 @@ def write_irregular_data(tsdb_file, series):
         :type series: pandas.Series
         :type freq: string
     """
-    existing = __read(tsdb_file)
-
     if series.dtype == np.float32:
         series = series.astype(np.float64)
 
-    overlap_idx = existing.index.intersection(series.index)
-    modified = series.loc[overlap_idx] != existing.value.loc[overlap_idx]
-    records_to_modify = existing.loc[overlap_idx].loc[modified.values]
-    new_records = series.index.difference(existing.index)
+    datestamps = __datestamps(series.index)
+    values = series.values
 
-    log_entries = {"C": [], "U": []}
+    log_entries = __new_log_entries()
 
-    if len(records_to_modify) == 0 and len(new_records) == 0:
-        return log_entries
+    num_records = os.path.getsize(tsdb_file) // entry_size
 
-    for date, orig_value, meta_id, new_value in zip(
-        records_to_modify.index,
-        records_to_modify.value,
-        records_to_modify.metaID,
-        series.loc[records_to_modify.index],
-    ):
-        datestamp = int(date.value / 1000000000)
-        log_entries["C"].append((datestamp, new_value, meta_id))
-        log_entries["U"].append((datestamp, orig_value, meta_id))
-
-    append_only = len(overlap_idx) == 0 and existing.index[-1] < series.index[0]
-    if append_only:
-        merged = series
-        fmode = "ab"
+    # Only existing records between the first and last incoming dates can
+    # overlap, so only that window of the file is read.
+    if num_records > 0:
+        existing = np.memmap(tsdb_file, dtype=entry_dtype, mode="r", shape=num_records)
+        first = __search_dates(existing, datestamps[0], side="left")
+        last = __search_dates(existing, datestamps[-1], side="right")
+        window = np.array(existing[first:last])
+        del existing
     else:
-        # combine_first does not preserve null values in the original series.
-        # So do an initial merge.
-        merged = series.combine_first(existing.value)
-        fmode = "wb"
+        first = last = 0
+        window = np.empty(0, dtype=entry_dtype)
 
-    # Then replace the null values from the update series.
-    null_vals = series.isnull()
-    null_idx = null_vals.loc[null_vals == True].index
-    merged.loc[null_idx] = np.nan
+    positions = np.searchsorted(window["date"], datestamps)
+    overlapping = positions < len(window)
+    overlapping[overlapping] = (
+        window["date"][positions[overlapping]] == datestamps[overlapping]
+    )
 
-    merged = pd.DataFrame({"value": merged})
+    existing_values = np.where(
+        window["metaID"] == METADATA_MISSING_VALUE, np.nan, window["value"]
+    )
 
-    merged["datestamp"] = pd.Series(
-        merged.index.map(lambda dateval: dateval.value // 1000000000),
-        index=merged.index,
+    modified = overlapping.copy()
+    modified[overlapping] = (
+        values[overlapping] != existing_values[positions[overlapping]]
     )
+    new_records = ~overlapping
 
-    new_logs = [
-        (row.datestamp, row.value, DEFAULT_META_ID)
-        for idx, row in merged.loc[new_records].iterrows()
-    ]
-    log_entries["C"] += new_logs
+    if not modified.any() and not new_records.any():
+        return log_entries
 
-    # Only attempt to do backups of file if we're doing a destructive
-    # write. This means if we are opening the file in "w" mode. If in
-    # append_only then we are using "a" mode which is non-destructive
-    # and we really actually want to keep the existing file's data.
-    if not append_only:
-        os.rename(tsdb_file, tsdb_file + "backup")
+    modified_positions = positions[modified]
+    log_entries = __add_log_entries(
+        log_entries,
+        "C",
+        datestamps[modified],
+        values[modified],
+        window["metaID"][modified_positions],
+    )
+    log_entries = __add_log_entries(
+        log_entries,
+        "U",
+        datestamps[modified],
+        existing_values[modified_positions],
+        window["metaID"][modified_positions],
+    )
+    log_entries = __add_log_entries(
+        log_entries, "C", datestamps[new_records], values[new_records], DEFAULT_META_ID
+    )
 
-    try:
-        with open(tsdb_file, fmode) as writer:
-
-            def write_record(row):
-                writer.write(__pack(int(row[0]), row[1]))
-                return row
-
-            np.apply_along_axis(write_record, 1, merged[["datestamp", "value"]].values)
-    except Exception:
-        # On any failure writing restore the original file.
-        if not append_only:
-            os.rename(tsdb_file + "backup", tsdb_file)
-        logger.exception(
-            "Error writing irregular data to %s. No data change made.", tsdb_file
-        )
-        raise
+    records = __to_records(datestamps, values)
+    updated = window.copy()
+    updated[modified_positions] = records[modified]
+
+    # Records from the first insertion point onwards need to be rewritten,
+    # updates before that point can be written in place.
+    if new_records.any():
+        insert_at = int(positions[new_records][0])
     else:
-        # On successfull write remove the original file.
-        if not append_only:
-            os.unlink(tsdb_file + "backup")
+        insert_at = len(window)
+
+    changed = np.zeros(len(window), dtype=bool)
+    changed[modified_positions] = True
+
+    with open(tsdb_file, "r+b") as writer:
+        if new_records.any():
+            writer.seek(entry_size * last, os.SEEK_SET)
+            remainder = np.fromfile(writer, dtype=entry_dtype)
+        else:
+            remainder = np.empty(0, dtype=entry_dtype)
+
+        try:
+            for run_start, run_end in __runs(changed[:insert_at]):
+                writer.seek(entry_size * (first + run_start), os.SEEK_SET)
+                updated[run_start:run_end].tofile(writer)
+
+            if new_records.any():
+                merged = np.concatenate((updated[insert_at:], records[new_records]))
+                merged = merged[np.argsort(merged["date"], kind="mergesort")]
+
+                writer.seek(entry_size * (first + insert_at), os.SEEK_SET)
+                merged.tofile(writer)
+                remainder.tofile(writer)
+        except Exception:
+            # On any failure writing restore the original records.
+            writer.seek(entry_size * first, os.SEEK_SET)
+            window.tofile(writer)
+            remainder.tofile(writer)
+            writer.truncate(entry_size * num_records)
+            logger.exception(
+                "Error writing irregular data to %s. No data change made.", tsdb_file
+            )
+            raise
 
     return log_entries
 
 
 def write_log(log_file, modified, replacement_datetime):
 
-    if not os.path.exists(log_file):
-        with LogHandler(log_file, "w") as writer:
-            writer.create_skeleton()
-
-    with LogHandler(log_file, "a") as writer:
+    with open_log(log_file, "a") as writer:
         writer.write(modified, calendar.timegm(replacement_datetime.utctimetuple()))
+
+
+def write_and_log(tsdb_file, log_file, ts, freq, replacement_datetime):
+    """
+        Write ts into tsdb_file and record the changes in log_file.
+
+        :param tsdb_file: File to write timeseries data into.
+        :type tsdb_file: string
+        :param log_file: Log file to record the changes in.
+        :type log_file: string
+        :param ts: Timeseries data to write.
+        :type ts: pd.Series
+        :param freq: Frequency of the data.
+        :type freq: string
+        :param replacement_datetime: Datetime to log the changes against.
+        :type replacement_datetime: datetime
+        :returns: dict -- Log entries as returned by write.
+    """
+    log_entries = write(tsdb_file, ts, freq)
+    write_log(log_file, log_entries, replacement_datetime)
+
+    return log_entries
+
+
+def write_batch(writes, replacement_datetime):
+    """
+        Write and log a batch of timeseries in turn.
+
+        An error writing one timeseries doesn't stop the rest of the batch,
+        the exception is returned in place of its log entries.
+
+        :param writes: (tsdb_file, log_file, ts, freq) of each write.
+        :type writes: list
+        :param replacement_datetime: Datetime to log the changes against.
+        :type replacement_datetime: datetime
+        :returns: list -- Log entries or exception of each write.
+    """
+    results = []
+    for tsdb_file, log_file, ts, freq in writes:
+        try:
+            results.append(
+                write_and_log(tsdb_file, log_file, ts, freq, replacement_datetime)
+            )
+        except Exception as e:
+            results.append(e)
+
+    return results
@@ -34,6 +34,7 @@ setup(
     entry_points={
         "console_scripts": [
             "phil-create = phildb.create:main",
+            "phil-upgrade = phildb.upgrade:main",
             "phildb = phildb.console:main",
             "phil = phildb.console:deprecated_main",
         ]
@@ -0,0 +1,182 @@
+import asyncio
+from datetime import datetime
+import gc
+import mock
+import os
+import pandas as pd
+import shutil
+import tempfile
+import time
+import unittest
+
+from phildb import reader
+from phildb import writer
+from phildb.async_database import AsyncPhilDB
+from phildb.exceptions import MissingDataError
+
+
+class AsyncDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        self.test_tsdb = os.path.join(tempfile.mkdtemp(), "tsdb")
+        shutil.copytree(
+            os.path.join(os.path.dirname(__file__), "test_data", "test_tsdb"),
+            self.test_tsdb,
+        )
+
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        gc.collect()
+        try:
+            shutil.rmtree(self.test_tsdb)
+        except OSError as e:
+            if e.errno != 2:  # Code 2: No such file or directory.
+                raise
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def gather(self, *coroutines):
+        async def gather():
+            return await asyncio.gather(*coroutines)
+
+        return self.run_async(gather())
+
+    def test_read(self):
+        db = AsyncPhilDB(self.test_tsdb)
+        results = self.run_async(db.read("410730", "D"))
+        db.close()
+
+        self.assertEqual(results.values[0], 1)
+        self.assertEqual(results.values[1], 2)
+        self.assertEqual(results.values[2], 3)
+
+    def test_read_coalesced(self):
+        db = AsyncPhilDB(self.test_tsdb, max_workers=4)
+
+        with mock.patch("phildb.reader.read", wraps=reader.read) as read:
+            results = self.gather(*[db.read("410730", "D") for i in range(10)])
+        db.close()
+
+        self.assertEqual(1, read.call_count)
+        for ts in results:
+            self.assertIs(results[0], ts)
+
+    def test_read_missing(self):
+        db = AsyncPhilDB(self.test_tsdb)
+        self.assertRaises(MissingDataError, self.run_async, db.read("410799", "D"))
+        db.close()
+
+    def test_max_pending(self):
+        db = AsyncPhilDB(self.test_tsdb, max_workers=8, max_pending=2)
+        running = []
+        concurrency = []
+        read = reader.read
+
+        def slow_read(*args):
+            running.append(1)
+            concurrency.append(len(running))
+            time.sleep(0.05)
+            running.pop()
+            return read(*args)
+
+        with mock.patch("phildb.reader.read", side_effect=slow_read):
+            results = self.gather(
+                *[db.read("410730", "D", start=datetime(2014, 1, i)) for i in [1, 2, 3]]
+                + [db.read("123456", "D", start=datetime(2014, 1, i)) for i in [1, 2]]
+            )
+
+        self.assertEqual(5, len(results))
+        self.assertEqual(2, max(concurrency))
+        self.assertEqual(0, db.pending)
+        db.close()
+
+    def test_write(self):
+        db = AsyncPhilDB(self.test_tsdb, max_workers=4)
+        db.db.add_timeseries("410731")
+        db.db.add_timeseries_instance(
+            "410731", "D", "Foo", measurand="Q", source="DATA_SOURCE"
+        )
+
+        dates = [datetime(2014, 1, 1), datetime(2014, 1, 2), datetime(2014, 1, 3)]
+
+        async def write_and_read():
+            await asyncio.gather(
+                db.write("410731", "D", pd.Series(index=dates, data=[1.0, 2.0, 3.0])),
+                db.write("410731", "D", pd.Series(index=dates, data=[1.0, 2.5, 3.0])),
+            )
+            return await asyncio.gather(
+                db.read("410731", "D"),
+                db.read_dataframe(["410730", "410731"], "D"),
+                db.read_log("410731", "D", datetime.utcnow()),
+            )
+
+        ts, df, log = self.run_async(write_and_read())
+        db.close()
+
+        self.assertEqual([1.0, 2.5, 3.0], list(ts.values))
+        self.assertEqual([1.0, 2.5, 3.0], list(df["410731"].values))
+        self.assertEqual([1.0, 2.5, 3.0], list(log.sort_index().values))
+
+        self.assertEqual({}, db._AsyncPhilDB__file_locks)
+
+    def test_read_dataframe_unlocked(self):
+        db = AsyncPhilDB(self.test_tsdb)
+        lock = db._AsyncPhilDB__lock
+        locked = []
+        read = reader.read
+
+        def check_read(*args):
+            locked.append(lock.locked())
+            return read(*args)
+
+        with mock.patch("phildb.reader.read", side_effect=check_read):
+            df = self.run_async(db.read_dataframe(["410730", "123456"], "D"))
+        db.close()
+
+        self.assertEqual(["410730", "123456"], list(df.columns))
+        self.assertEqual([False, False], locked)
+
+    def test_write_and_read_ordered(self):
+        db = AsyncPhilDB(self.test_tsdb, max_workers=4)
+        db.db.add_timeseries("410731")
+        db.db.add_timeseries_instance(
+            "410731", "D", "Foo", measurand="Q", source="DATA_SOURCE"
+        )
+
+        dates = [datetime(2014, 1, 1), datetime(2014, 1, 2), datetime(2014, 1, 3)]
+        running = []
+        concurrency = []
+        write = writer.write
+
+        def slow_write(*args):
+            running.append(1)
+            concurrency.append(len(running))
+            time.sleep(0.05)
+            try:
+                return write(*args)
+            finally:
+                running.pop()
+
+        with mock.patch("phildb.writer.write", side_effect=slow_write):
+            results = self.gather(
+                db.write("410731", "D", pd.Series(index=dates, data=[1.0, 2.0, 3.0])),
+                db.read("410731", "D"),
+                db.write(
+                    "410731",
+                    "D",
+                    pd.Series(index=dates, data=[1.0, 2.5, 3.0]),
+                    measurand="Q",
+                    source="DATA_SOURCE",
+                ),
+                db.read_dataframe(["410731"], "D"),
+            )
+        db.close()
+
+        # Writes to the same file never overlap, whatever attributes they
+        # name it with, and each read sees the writes made before it.
+        self.assertEqual([1, 1], concurrency)
+        self.assertEqual([1.0, 2.0, 3.0], list(results[1].values))
+        self.assertEqual([1.0, 2.5, 3.0], list(results[3]["410731"].values))
+        self.assertEqual({}, db._AsyncPhilDB__file_locks)
@@ -0,0 +1,223 @@
+import numpy as np
+import os
+import pandas as pd
+import shutil
+import tempfile
+import unittest
+
+from phildb import chunked
+from phildb import reader
+from phildb import writer
+from phildb.constants import MISSING_VALUE, METADATA_MISSING_VALUE
+
+
+class ChunkedTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.chunked_file = os.path.join(self.tmp_dir, "chunked.tsdb")
+        self.legacy_file = os.path.join(self.tmp_dir, "legacy.tsdb")
+
+        self.dates = 1388534400 + np.arange(25, dtype=np.int64) * 86400
+        self.dates[20:] += 3600
+        self.values = np.arange(25, dtype=np.float64) / 4
+        self.values[5:8] = MISSING_VALUE
+        self.meta_ids = np.zeros(25, dtype=np.int32)
+        self.meta_ids[5:8] = METADATA_MISSING_VALUE
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(self.tmp_dir)
+        except OSError as e:
+            if e.errno != 2:  # Code 2: No such file or directory.
+                raise
+
+    def test_round_trip(self):
+        chunked.create(self.chunked_file, chunk_records=10)
+        chunked.replace(
+            self.chunked_file, 0, None, [(self.dates, self.values, self.meta_ids)]
+        )
+
+        self.assertTrue(chunked.is_chunked(self.chunked_file))
+        chunk_records, chunks = chunked.read_index(self.chunked_file)
+        self.assertEqual(10, chunk_records)
+        self.assertEqual([10, 10, 5], [chunk[1] for chunk in chunks])
+
+        dates, values, meta_ids = chunked.read(self.chunked_file)
+        np.testing.assert_array_equal(self.dates, dates)
+        np.testing.assert_array_equal(self.values, values)
+        np.testing.assert_array_equal(self.meta_ids, meta_ids)
+
+    def test_read_window(self):
+        chunked.create(self.chunked_file, chunk_records=10)
+        chunked.replace(
+            self.chunked_file, 0, None, [(self.dates, self.values, self.meta_ids)]
+        )
+
+        dates, values, meta_ids = chunked.read(
+            self.chunked_file, self.dates[8] + 1, self.dates[21]
+        )
+        np.testing.assert_array_equal(self.dates[9:22], dates)
+        np.testing.assert_array_equal(self.values[9:22], values)
+
+        ts = reader.read(self.chunked_file, "2014-01-05", "2014-01-10")
+        self.assertEqual(6, len(ts))
+        self.assertTrue(np.isnan(ts["2014-01-06"]))
+        self.assertEqual(2.0, ts["2014-01-09"])
+
+    def test_read_latest(self):
+        chunked.create(self.chunked_file, chunk_records=10)
+        chunked.replace(
+            self.chunked_file, 0, None, [(self.dates, self.values, self.meta_ids)]
+        )
+
+        data = reader.read(self.chunked_file)
+        for n in [1, 5, 6, 15, 30]:
+            pd.testing.assert_series_equal(
+                data.iloc[-n:], reader.read_latest(self.chunked_file, n)
+            )
+
+    def test_iter_chunks(self):
+        chunked.create(self.chunked_file, chunk_records=10)
+        chunked.replace(
+            self.chunked_file, 0, None, [(self.dates, self.values, self.meta_ids)]
+        )
+
+        for chunk_records, sizes in [
+            (4, [4, 4, 4, 4, 4, 4, 1]),
+            (10, [10, 10, 5]),
+            (15, [15, 10]),
+            (30, [25]),
+        ]:
+            chunks = list(
+                reader.iter_chunks(self.chunked_file, chunk_records, as_series=False)
+            )
+            self.assertEqual(sizes, [len(dates) for dates, values in chunks])
+            np.testing.assert_array_equal(
+                self.dates,
+                np.concatenate([dates for dates, values in chunks]).astype(np.int64),
+            )
+
+    def test_replace(self):
+        chunked.create(self.chunked_file, chunk_records=10)
+        chunked.replace(
+            self.chunked_file, 0, None, [(self.dates, self.values, self.meta_ids)]
+        )
+
+        values = self.values.copy()
+        values[10:20] += 1
+        chunked.replace(
+            self.chunked_file,
+            1,
+            2,
+            [
+                (self.dates[10:15], values[10:15], self.meta_ids[10:15]),
+                (self.dates[15:20], values[15:20], self.meta_ids[15:20]),
+            ],
+        )
+
+        dates, read_values, meta_ids = chunked.read(self.chunked_file)
+        np.testing.assert_array_equal(self.dates, dates)
+        np.testing.assert_array_equal(values, read_values)
+
+        self.assertRaises(
+            ValueError,
+            chunked.replace,
+            self.chunked_file,
+            1,
+            2,
+            [(self.dates[10:15], values[10:15], self.meta_ids[10:15])],
+        )
+        dates, read_values, meta_ids = chunked.read(self.chunked_file)
+        np.testing.assert_array_equal(values, read_values)
+        self.assertFalse(os.path.exists(self.chunked_file + ".tmp"))
+
+    def test_replace_unwritable(self):
+        chunked.create(self.chunked_file, chunk_records=10)
+        os.mkdir(self.chunked_file + ".tmp")
+
+        with self.assertRaises(IsADirectoryError) as context:
+            chunked.replace(
+                self.chunked_file, 0, None, [(self.dates, self.values, self.meta_ids)]
+            )
+
+        # Failing to create the temporary file isn't followed by removing it.
+        self.assertIsNone(context.exception.__context__)
+        self.assertTrue(os.path.isdir(self.chunked_file + ".tmp"))
+
+    def test_write_in_place(self):
+        chunked.create(self.chunked_file, chunk_records=4)
+        series = pd.Series(np.arange(20.0), pd.date_range("2014-01-01", periods=20))
+        writer.write(self.chunked_file, series, "D")
+
+        chunk_records, chunks = chunked.read_index(self.chunked_file)
+        with open(self.chunked_file, "rb") as reader_file:
+            reader_file.seek(chunks[2][0])
+            following = reader_file.read()
+
+        writer.write(self.chunked_file, series[5:7] * 2, "D")
+
+        chunk_records, chunks = chunked.read_index(self.chunked_file)
+        self.assertEqual([4] * 5, [chunk[1] for chunk in chunks])
+        with open(self.chunked_file, "rb") as reader_file:
+            reader_file.seek(chunks[2][0])
+            self.assertEqual(following, reader_file.read())
+
+        expected = series.copy()
+        expected[5:7] *= 2
+        pd.testing.assert_series_equal(
+            expected,
+            reader.read(self.chunked_file),
+            check_names=False,
+            check_freq=False,
+        )
+
+    def test_legacy_file(self):
+        self.assertFalse(chunked.is_chunked(self.legacy_file))
+
+        writer.write(
+            self.legacy_file,
+            pd.Series([1.0, 2.0], pd.date_range("2014-01-01", periods=2)),
+            "D",
+        )
+        self.assertFalse(chunked.is_chunked(self.legacy_file))
+
+    def test_write(self):
+        chunked.create(self.chunked_file, chunk_records=4)
+
+        writes = [
+            pd.Series(np.arange(10.0), pd.date_range("2014-01-05", periods=10)),
+            pd.Series([1.5, np.nan], pd.date_range("2014-01-12", periods=2)),
+            pd.Series([7.0], pd.date_range("2014-01-20", periods=1)),
+            pd.Series([3.0, 4.0], pd.date_range("2014-01-01", periods=2)),
+        ]
+        for ts in writes:
+            expected = writer.write(self.legacy_file, ts, "D")
+            log_entries = writer.write(self.chunked_file, ts, "D")
+            for kind in ["C", "U"]:
+                self.assertEqual(expected[kind].tobytes(), log_entries[kind].tobytes())
+
+        self.assertTrue(chunked.is_chunked(self.chunked_file))
+        pd.testing.assert_series_equal(
+            reader.read(self.legacy_file), reader.read(self.chunked_file)
+        )
+
+    def test_write_irregular(self):
+        chunked.create(self.chunked_file, chunk_records=3)
+
+        dates = pd.to_datetime(
+            ["2014-01-01", "2014-01-03", "2014-01-04 06:00", "2014-01-09", "2014-02-01"]
+        )
+        writes = [
+            pd.Series([1.0, 2.0, 3.0, 4.0, 5.0], dates),
+            pd.Series([2.5, 6.0], pd.to_datetime(["2014-01-03", "2014-01-05"])),
+            pd.Series([0.5], pd.to_datetime(["2013-12-01"])),
+        ]
+        for ts in writes:
+            expected = writer.write(self.legacy_file, ts, "IRR")
+            log_entries = writer.write(self.chunked_file, ts, "IRR")
+            for kind in ["C", "U"]:
+                self.assertEqual(expected[kind].tobytes(), log_entries[kind].tobytes())
+
+        pd.testing.assert_series_equal(
+            reader.read(self.legacy_file), reader.read(self.chunked_file)
+        )
@@ -16,10 +16,13 @@ from sqlalchemy.orm.exc import MultipleResultsFound
 
 Session = sessionmaker()
 
+from phildb import chunked
+from phildb import summary
 from phildb.database import PhilDB
 from phildb.dbstructures import TimeseriesInstance
 from phildb.create import create
 from phildb.exceptions import DuplicateError, MissingAttributeError, MissingDataError
+from phildb.log_handler import TabDesc
 
 uuid_pool = itertools.cycle(["47e4e0b4-0c04-4c1d-8dc4-272acfcd6bb3"])
 
@@ -100,13 +103,29 @@ class DatabaseTest(unittest.TestCase):
         )
 
     def test_meta_data(self):
-        db_name = os.path.join(self.test_data_dir, "test_tsdb")
+        db_name = self.test_tsdb
         db = PhilDB(db_name)
 
-        self.assertEqual(db.version(), "0.0.6")
+        self.assertEqual(db.version(), "0.0.7")
+
+    def test_meta_data_connection(self):
+        db = PhilDB(self.test_tsdb)
+        db.read("410730", "D")
+        db.list_timeseries_instances(measurand="Q")
+        self.assertRaises(DuplicateError, db.add_timeseries, "410730")
+
+        engine = db._PhilDB__engine
+        self.assertEqual(0, engine.pool.checkedout())
+
+        with engine.connect() as connection:
+            self.assertEqual("wal", connection.execute("PRAGMA journal_mode").scalar())
+            self.assertEqual(1, connection.execute("PRAGMA synchronous").scalar())
+
+        db.close()
+        self.assertEqual(0, engine.pool.checkedin())
 
     def test_tsdb_data_dir(self):
-        db_name = os.path.join(self.test_data_dir, "test_tsdb")
+        db_name = self.test_tsdb
         db = PhilDB(db_name)
         self.assertEqual(db._PhilDB__data_dir(), os.path.join(db_name, "data"))
 
@@ -131,6 +150,58 @@ class DatabaseTest(unittest.TestCase):
             ),
         )
 
+    def test_get_file_path_cache(self):
+        db = PhilDB(self.test_tsdb)
+        file_path = db.get_file_path("410730", "D", measurand="Q")
+
+        with mock.patch.object(
+            db, "_PhilDB__get_ts_instance", side_effect=AssertionError
+        ):
+            self.assertEqual(file_path, db.get_file_path("410730", "D"))
+            self.assertEqual(
+                file_path,
+                db.get_file_path("410730", "D", measurand="Q", source="DATA_SOURCE"),
+            )
+
+        db.add_measurand("P", "PRECIPITATION", "Precipitation")
+        db.add_timeseries_instance(
+            "410730", "D", "Foo", measurand="P", source="DATA_SOURCE"
+        )
+
+        self.assertNotEqual(file_path, db.get_file_path("410730", "D", measurand="P"))
+        self.assertEqual(file_path, db.get_file_path("410730", "D", measurand="Q"))
+        self.assertRaises(MultipleResultsFound, db.get_file_path, "410730", "D")
+
+    def test_get_file_path_cache_stale(self):
+        db = PhilDB(self.test_tsdb)
+        db.get_file_path("410730", "D")
+
+        other_db = PhilDB(self.test_tsdb)
+        other_db.add_timeseries("410731")
+        other_db.add_timeseries_instance(
+            "410731", "D", "Foo", measurand="Q", source="DATA_SOURCE"
+        )
+
+        self.assertEqual(
+            other_db.get_file_path("410731", "D"), db.get_file_path("410731", "D")
+        )
+        self.assertRaises(MissingDataError, db.get_file_path, "410732", "D")
+
+    def test_get_file_path_cache_reset(self):
+        db = PhilDB(self.test_tsdb)
+        file_path = db.get_file_path("410730", "D")
+        is_instance_query = db._PhilDB__is_instance_query
+
+        def reset_cache(kwargs):
+            # Another thread resets the cache while it is being used.
+            db._PhilDB__instance_cache = None
+            return is_instance_query(kwargs)
+
+        with mock.patch.object(
+            db, "_PhilDB__is_instance_query", side_effect=reset_cache
+        ):
+            self.assertEqual(file_path, db.get_file_path("410730", "D"))
+
     def test_add_ts_entry(self):
         create(self.temp_dir)
         db = PhilDB(self.temp_dir)
@@ -158,7 +229,7 @@ class DatabaseTest(unittest.TestCase):
         self.assertEqual(measurand_description, "Precipitation")
 
     def test_read(self):
-        db_name = os.path.join(self.test_data_dir, "test_tsdb")
+        db_name = self.test_tsdb
         db = PhilDB(db_name)
 
         results = db.read("410730", "D", measurand="Q", source="DATA_SOURCE")
@@ -173,6 +244,22 @@ class DatabaseTest(unittest.TestCase):
         self.assertEqual(results.values[1], 2)
         self.assertEqual(results.values[2], 3)
 
+    def test_read_window(self):
+        db = PhilDB(self.test_tsdb)
+
+        results = db.read("410730", "D", start=datetime(2014, 1, 2))
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results.index[0].day, 2)
+        self.assertEqual(results.values[0], 2)
+        self.assertEqual(results.values[1], 3)
+
+        results = db.read(
+            "410730", "D", end=datetime(2014, 1, 2), measurand="Q", source="DATA_SOURCE"
+        )
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results.values[0], 1)
+        self.assertEqual(results.values[1], 2)
+
     def test_read_unique(self):
         db = PhilDB(self.test_tsdb)
 
@@ -559,6 +646,54 @@ class DatabaseTest(unittest.TestCase):
         all = db.read_all("D", excludes=["410730"], measurand="Q", source="DATA_SOURCE")
         self.assertEqual("123456", all.columns[0])
 
+    def test_read_dataframe_bulk_lookup(self):
+        db = PhilDB(self.test_tsdb)
+
+        with mock.patch.object(
+            db, "_PhilDB__get_ts_instance", side_effect=AssertionError
+        ):
+            all = db.read_all("D", measurand="Q")
+            self.assertEqual(["123456", "410730"], list(all.columns))
+
+            all = db.read_dataframe(["410730", "123456"], "D", source="DATA_SOURCE")
+            self.assertEqual(["410730", "123456"], list(all.columns))
+
+        self.assertRaises(
+            MissingDataError, db.read_dataframe, ["410730", "410731"], "D"
+        )
+        self.assertRaises(MissingAttributeError, db.read_all, "D", measurand="X")
+
+    def test_read_dataframe_workers(self):
+        db = PhilDB(self.test_tsdb)
+        db.add_timeseries("410731")
+        db.add_timeseries_instance(
+            "410731", "D", "Foo", measurand="Q", source="DATA_SOURCE"
+        )
+        db.write(
+            "410731", "D", pd.Series([1.0, 2.0], pd.date_range("2014-01-10", periods=2))
+        )
+
+        identifiers = ["410730", "123456", "410731"]
+        expected = pd.DataFrame(dict((i, db.read(i, "D")) for i in identifiers))
+
+        for workers in [None, 2]:
+            df = db.read_dataframe(identifiers, "D", workers=workers)
+            pd.testing.assert_frame_equal(expected, df, check_freq=False)
+
+    def test_read_dataframe_aligned(self):
+        db = PhilDB(self.test_tsdb)
+        for ts_id, start in [("410731", "2014-02-01"), ("410732", "2014-02-01 12:00")]:
+            db.add_timeseries(ts_id)
+            db.add_timeseries_instance(
+                ts_id, "D", "Foo", measurand="Q", source="DATA_SOURCE"
+            )
+            db.write(ts_id, "D", pd.Series([1.0, 2.0], pd.date_range(start, periods=2)))
+
+        for identifiers in [["410730", "410731"], ["410730", "410731", "410732"]]:
+            expected = pd.DataFrame(dict((i, db.read(i, "D")) for i in identifiers))
+            df = db.read_dataframe(identifiers, "D")
+            pd.testing.assert_frame_equal(expected, df, check_freq=False)
+
     def test_list_ts_instance(self):
         db = PhilDB(self.test_tsdb)
 
@@ -633,6 +768,96 @@ class DatabaseTest(unittest.TestCase):
             self.assertEqual(log_grp.log[4][0], 1388793600)
             self.assertEqual(log_grp.log[4][1], 4.0)
 
+    def test_write_many(self):
+        db = PhilDB(self.test_tsdb)
+
+        for ts_id in ["410731", "410732", "410733"]:
+            db.add_timeseries(ts_id)
+            db.add_timeseries_instance(
+                ts_id, "D", "Foo", measurand="Q", source="DATA_SOURCE"
+            )
+
+        dates = [datetime(2014, 1, 1), datetime(2014, 1, 2), datetime(2014, 1, 3)]
+        for workers, ts_id in [(None, "410731"), (2, "410732")]:
+            results = db.write_many(
+                [
+                    (ts_id, "D", pd.Series(index=dates, data=[1.0, 2.0, 3.0])),
+                    ("410799", "D", pd.Series(index=dates, data=[1.0, 2.0, 3.0])),
+                    ("410733", "D", pd.Series(index=dates, data=[4.0, 5.0, 6.0])),
+                    (ts_id, "D", pd.Series(index=dates, data=[1.0, 2.5, 3.0])),
+                ],
+                workers=workers,
+                measurand="Q",
+            )
+
+            self.assertEqual(3, len(results[0]["C"]))
+            self.assertIsInstance(results[1], MissingDataError)
+            self.assertEqual([(1388620800, 2.0, 0)], results[3]["U"].tolist())
+            self.assertEqual([1.0, 2.5, 3.0], list(db.read(ts_id, "D").values))
+            self.assertEqual([4.0, 5.0, 6.0], list(db.read("410733", "D").values))
+
+            with tables.open_file(
+                db.get_file_path(ts_id, "D", ftype="hdf5"), "r"
+            ) as hdf5_file:
+                log = hdf5_file.get_node("/data/log")
+                self.assertEqual(4, len(log))
+                self.assertEqual(1, len(set(log.col("replacement_time"))))
+
+    def test_read_log_window(self):
+        db = PhilDB(self.test_tsdb)
+        db.add_timeseries("410731")
+        db.add_timeseries_instance(
+            "410731", "D", "Foo", measurand="Q", source="DATA_SOURCE"
+        )
+        dates = [datetime(2014, 1, 1), datetime(2014, 1, 2), datetime(2014, 1, 3)]
+
+        with mock.patch("phildb.database.datetime") as mock_datetime:
+            mock_datetime.utcnow.return_value = datetime(2015, 1, 1)
+            db.write("410731", "D", pd.Series(index=dates, data=[1.0, 2.0, 3.0]))
+
+            mock_datetime.utcnow.return_value = datetime(2015, 2, 1)
+            db.write("410731", "D", pd.Series(index=dates, data=[1.0, 2.5, 3.5]))
+
+        results = db.read_log(
+            "410731",
+            "D",
+            datetime(2015, 1, 15),
+            start=datetime(2014, 1, 2),
+            end=datetime(2014, 1, 2),
+        )
+        self.assertEqual(1, len(results))
+        self.assertEqual(2.0, results.values[0])
+
+        results = db.read_log(
+            "410731", "D", datetime(2015, 2, 15), start=datetime(2014, 1, 2)
+        )
+        self.assertEqual([2.5, 3.5], list(results.values))
+
+    def test_index_logs(self):
+        db = PhilDB(self.test_tsdb)
+        log_file = db.get_file_path("410730", "D", ftype="hdf5")
+
+        with tables.open_file(log_file, "w") as hdf5_file:
+            data_group = hdf5_file.create_group("/", "data", "data group")
+            hdf5_file.create_table(data_group, "log", TabDesc)
+
+        db.index_logs()
+
+        with tables.open_file(log_file, "r") as hdf5_file:
+            log = hdf5_file.get_node("/data/log")
+            self.assertTrue(log.cols.time.is_indexed)
+            self.assertTrue(log.cols.replacement_time.is_indexed)
+
+    def test_index_summaries(self):
+        db = PhilDB(self.test_tsdb)
+        summary_file = summary.summary_file(db.get_file_path("410730", "D"))
+        self.assertFalse(os.path.exists(summary_file))
+
+        db.index_summaries()
+
+        self.assertTrue(os.path.exists(summary_file))
+        self.assertEqual([6.0], list(db.aggregate("410730", "D", "sum", "M").values))
+
     def test_add_duplicates(self):
         db = PhilDB(self.test_tsdb)
         with self.assertRaises(DuplicateError) as context:
@@ -649,6 +874,168 @@ class DatabaseTest(unittest.TestCase):
                 "410730", "D", "", source="DATA_SOURCE", measurand="Q"
             )
 
+    def test_add_timeseries_bulk(self):
+        db = PhilDB(self.test_tsdb)
+
+        duplicates = db.add_timeseries_bulk(["410731", " 410732 ", "410730", "410731"])
+
+        self.assertEqual(["410730", "410731"], duplicates)
+        self.assertEqual(["123456", "410730", "410731", "410732"], db.list_ids())
+
+    def test_add_timeseries_instances_bulk(self):
+        db = PhilDB(self.test_tsdb)
+        identifiers = ["{0}".format(i) for i in range(500000, 501200)]
+        db.add_timeseries_bulk(identifiers)
+
+        duplicates = db.add_timeseries_instances_bulk(
+            [(i, "Foo") for i in identifiers] + [("410730", "")],
+            "D",
+            measurand="Q",
+            source="DATA_SOURCE",
+        )
+
+        self.assertEqual(["410730"], duplicates)
+        self.assertEqual("Foo", db.read_metadata("500001", "D", measurand="Q"))
+        self.assertEqual(
+            1202, len(db.list_timeseries_instances(freq="D", measurand="Q"))
+        )
+
+        db.write("500001", "D", pd.Series([1.0], [datetime(2014, 1, 1)]))
+        self.assertEqual([1.0], list(db.read("500001", "D").values))
+
+        self.assertRaises(
+            MissingDataError,
+            db.add_timeseries_instances_bulk,
+            [("500000", ""), ("410799", "")],
+            "MS",
+            measurand="Q",
+            source="DATA_SOURCE",
+        )
+        self.assertRaises(MissingDataError, db.get_file_path, "500000", "MS")
+
+    def test_aggregate(self):
+        db = PhilDB(self.test_tsdb)
+        db.add_timeseries("410731")
+        db.add_timeseries_instance(
+            "410731", "D", "", measurand="Q", source="DATA_SOURCE"
+        )
+        db.write(
+            "410731",
+            "D",
+            pd.Series(range(60), pd.date_range("2014-01-01", periods=60), dtype=float),
+        )
+
+        totals = db.aggregate("410731", "D", "sum", "M")
+        self.assertEqual(
+            ["2014-01", "2014-02", "2014-03"], [str(period) for period in totals.index]
+        )
+        self.assertEqual([465.0, 1246.0, 59.0], list(totals.values))
+
+        maxima = db.aggregate(
+            "410731", "D", "max", "M", start="2014-01-10", end="2014-02-10"
+        )
+        self.assertEqual([30.0, 40.0], list(maxima.values))
+
+    def test_read_latest(self):
+        db = PhilDB(self.test_tsdb)
+
+        latest = db.read_latest("410730", "D")
+        self.assertEqual([datetime(2014, 1, 3)], list(latest.index))
+        self.assertEqual([3.0], list(latest.values))
+
+        self.assertEqual([2.0, 3.0], list(db.read_latest("410730", "D", n=2).values))
+        self.assertRaises(MissingDataError, db.read_latest, "410799", "D")
+
+    def test_read_latest_many(self):
+        db = PhilDB(self.test_tsdb)
+
+        latest = db.read_latest_many(["410730", "123456"], "D", n=2)
+        expected = pd.concat(
+            [db.read("410730", "D")[-2:], db.read("123456", "D")[-2:]],
+            keys=["410730", "123456"],
+            names=["identifier"],
+        ).to_frame()
+        pd.testing.assert_frame_equal(expected, latest)
+
+        latest = db.read_latest_many(
+            ["410730", "123456"], "D", measurand="Q", source="DATA_SOURCE"
+        )
+        self.assertEqual(3.0, latest.loc[("410730", datetime(2014, 1, 3)), "value"])
+
+        self.assertEqual(0, len(db.read_latest_many([], "D")))
+        self.assertRaises(MissingDataError, db.read_latest_many, ["410799"], "D")
+
+    def test_iter_read(self):
+        db = PhilDB(self.test_tsdb)
+
+        chunks = list(db.iter_read("410730", "D", chunk_records=2))
+        self.assertEqual([2, 1], [len(chunk) for chunk in chunks])
+        self.assertEqual([1.0, 2.0, 3.0], list(pd.concat(chunks).values))
+
+        self.assertRaises(MissingDataError, db.iter_read, "410799", "D")
+
+    def test_read_resampled(self):
+        db = PhilDB(self.test_tsdb)
+        db.add_timeseries("410731")
+        db.add_timeseries_instance(
+            "410731", "H", "", measurand="Q", source="DATA_SOURCE"
+        )
+        db.write(
+            "410731",
+            "H",
+            pd.Series(
+                range(72),
+                pd.date_range("2014-01-01", periods=72, freq="H"),
+                dtype=float,
+            ),
+        )
+
+        daily = db.read_resampled("410731", "H", "D", "mean")
+        self.assertEqual([11.5, 35.5, 59.5], list(daily.values))
+        self.assertEqual(pd.Timestamp("2014-01-01"), daily.index[0])
+
+        totals = db.read_resampled(
+            "410731", "H", "12H", "sum", start="2014-01-02 06:00"
+        )
+        self.assertEqual([195.0, 498.0, 642.0, 786.0], list(totals.values))
+        self.assertEqual(pd.Timestamp("2014-01-02"), totals.index[0])
+
+    def test_chunked_data_format(self):
+        db = PhilDB(self.test_tsdb)
+        db.add_timeseries("410731")
+        db.add_timeseries_instance(
+            "410731",
+            "D",
+            "",
+            data_format="chunked",
+            measurand="Q",
+            source="DATA_SOURCE",
+        )
+
+        db.write(
+            "410731", "D", pd.Series([1.0, 2.0], pd.date_range("2014-01-01", periods=2))
+        )
+        db.write(
+            "410731", "D", pd.Series([2.5, 3.0], pd.date_range("2014-01-02", periods=2))
+        )
+
+        self.assertTrue(chunked.is_chunked(db.get_file_path("410731", "D")))
+        self.assertEqual([1.0, 2.5, 3.0], list(db.read("410731", "D").values))
+        self.assertEqual(
+            [2.5], list(db.read("410731", "D", start="2014-01-02", end="2014-01-02"))
+        )
+
+        self.assertRaises(
+            ValueError,
+            db.add_timeseries_instance,
+            "410731",
+            "MS",
+            "",
+            data_format="compressed",
+            measurand="Q",
+            source="DATA_SOURCE",
+        )
+
     def test_multiple_db_instances(self):
         db1 = PhilDB(self.test_tsdb)
         db2 = PhilDB(self.second_test_db)
@@ -8,7 +8,8 @@ import tempfile
 import unittest
 from datetime import datetime
 
-from phildb.log_handler import LogHandler
+from phildb import log_handler
+from phildb.log_handler import LogHandler, TabDesc, log_entry_dtype
 
 
 class LogHandlerTest(unittest.TestCase):
@@ -139,3 +140,134 @@ class LogHandlerTest(unittest.TestCase):
         self.assertEqual(data["original_data"].value[1], 3.0)
         self.assertEqual(data["middle_data"].value[1], 4.0)
         self.assertEqual(data["last_data"].value[1], 5.0)
+
+    def test_write_structured_array(self):
+        log_file = os.path.join(self.tmp_dir, "array_log_file.hdf5")
+
+        log_entries = {
+            "C": np.array(
+                [(1388620800, 2.0, 0), (1388707200, np.nan, 0)], dtype=log_entry_dtype
+            ),
+            "U": np.empty(0, dtype=log_entry_dtype),
+        }
+
+        with LogHandler(log_file, "w") as writer:
+            writer.create_skeleton()
+
+        with LogHandler(log_file, "a") as writer:
+            writer.write(log_entries, self.create_datetime)
+
+        with tables.open_file(log_file, "r") as hdf5_file:
+            log = hdf5_file.get_node("/data/log").read()
+
+        self.assertEqual(
+            [
+                (1388620800, 2.0, 0, self.create_datetime),
+                (1388707200, -9999, 9999, self.create_datetime),
+            ],
+            log.tolist(),
+        )
+
+    def test_indexes(self):
+        with tables.open_file(self.log_file, "r") as hdf5_file:
+            log = hdf5_file.get_node("/data/log")
+
+            self.assertTrue(log.cols.time.is_indexed)
+            self.assertTrue(log.cols.replacement_time.is_indexed)
+            self.assertEqual(
+                frozenset(["replacement_time"]),
+                log.will_query_use_indexing("replacement_time <= 0"),
+            )
+
+    def test_index_existing_log(self):
+        log_file = os.path.join(self.tmp_dir, "unindexed_log_file.hdf5")
+
+        with tables.open_file(log_file, "w") as hdf5_file:
+            data_group = hdf5_file.create_group("/", "data", "data group")
+            hdf5_file.create_table(data_group, "log", TabDesc)
+
+        with LogHandler(log_file, "a") as writer:
+            writer.write({"C": [(1388620800, 2.0, 0)], "U": []}, self.create_datetime)
+
+        with tables.open_file(log_file, "r") as hdf5_file:
+            log = hdf5_file.get_node("/data/log")
+
+            self.assertTrue(log.cols.time.is_indexed)
+            self.assertTrue(log.cols.replacement_time.is_indexed)
+            self.assertEqual(1, len(log))
+
+        with LogHandler(log_file, "r") as reader:
+            data = reader.read(self.create_datetime)
+        self.assertEqual(2.0, data.value[0])
+
+    def test_read_log_window(self):
+        with LogHandler(self.log_file, "r") as reader:
+            data = reader.read(self.second_update_datetime, start=1388707200)
+            self.assertEqual(1, len(data))
+            self.assertEqual(pd.Timestamp("2014-01-03"), data.index[0])
+            self.assertEqual(5.0, data.value[0])
+
+            data = reader.read(self.update_datetime, end=1388620800)
+            self.assertEqual(1, len(data))
+            self.assertTrue(np.isnan(data.value[0]))
+
+            data = reader.read(self.update_datetime, start=1388707200, end=1388707200)
+            self.assertEqual(1, len(data))
+            self.assertEqual(4.0, data.value[0])
+
+            data = reader.read(self.update_datetime, start=1388793600)
+            self.assertEqual(0, len(data))
+
+    def test_open_log_creates_skeleton(self):
+        log_file = os.path.join(self.tmp_dir, "new_log_file.hdf5")
+
+        with log_handler.open_log(log_file, "a") as writer:
+            writer.write({"C": [(1388620800, 2.0, 0)], "U": []}, self.create_datetime)
+
+        with log_handler.open_log(log_file, "r") as reader:
+            self.assertEqual([2.0], list(reader.read(self.create_datetime).value))
+
+        self.assertRaises(
+            IOError,
+            log_handler.open_log(
+                os.path.join(self.tmp_dir, "missing.hdf5"), "r"
+            ).__enter__,
+        )
+
+    def test_pool(self):
+        log_files = [
+            os.path.join(self.tmp_dir, "log_{0}.hdf5".format(i)) for i in range(3)
+        ]
+
+        log_handler.enable_pool(max_size=2)
+        try:
+            handlers = []
+            for i, log_file in enumerate(log_files):
+                with log_handler.open_log(log_file, "a") as writer:
+                    writer.write(
+                        {"C": [(1388620800, float(i), 0)], "U": []},
+                        self.create_datetime,
+                    )
+                    handlers.append(writer)
+
+            # The most recently used logs are still open and reused.
+            with log_handler.open_log(log_files[2], "r") as reader:
+                self.assertIs(handlers[2], reader)
+                self.assertEqual([2.0], list(reader.read(self.create_datetime).value))
+
+            # The least recently used log was closed when evicted.
+            self.assertIsNone(handlers[0].hdf5)
+            with log_handler.open_log(log_files[0], "r") as reader:
+                self.assertIsNot(handlers[0], reader)
+                self.assertEqual([0.0], list(reader.read(self.create_datetime).value))
+
+                # Logs that aren't in the pool are opened read only to be
+                # read and aren't added to it.
+                self.assertEqual("r", reader.hdf5.mode)
+
+            self.assertIsNone(reader.hdf5)
+            self.assertIsNotNone(handlers[1].hdf5)
+        finally:
+            log_handler.disable_pool()
+
+        self.assertIsNone(handlers[2].hdf5)
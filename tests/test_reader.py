@@ -55,3 +55,179 @@ class ReaderTest(unittest.TestCase):
         data = reader.read("/tmp/not_an_actual_existing_file")
 
         self.assertEqual(0, len(data))
+
+    def test_read_window(self):
+        for freq in ["D", "IRR", None]:
+            data = reader.read(
+                self.tsdb_file_with_missing,
+                start=datetime(2014, 1, 2),
+                end=datetime(2014, 1, 4),
+                freq=freq,
+            )
+
+            self.assertEqual(3, len(data))
+            self.assertEqual(datetime(2014, 1, 2), data.index[0].to_pydatetime())
+            self.assertEqual(datetime(2014, 1, 4), data.index[-1].to_pydatetime())
+            self.assertEqual(2.0, data.values[0])
+            self.assertEqual(3.0, data.values[1])
+            self.assertTrue(np.isnan(data.values[2]))
+
+    def test_read_window_between_records(self):
+        for freq in ["D", "IRR"]:
+            data = reader.read(
+                self.tsdb_file_with_missing,
+                start=datetime(2014, 1, 4, 12),
+                end=datetime(2014, 1, 6, 12),
+                freq=freq,
+            )
+
+            self.assertEqual(2, len(data))
+            self.assertEqual(datetime(2014, 1, 5), data.index[0].to_pydatetime())
+            self.assertEqual(datetime(2014, 1, 6), data.index[-1].to_pydatetime())
+
+    def test_read_window_open_ended(self):
+        data = reader.read(self.tsdb_file, start=datetime(2014, 1, 3), freq="D")
+        self.assertEqual(1, len(data))
+        self.assertEqual(3.0, data.values[0])
+
+        data = reader.read(self.tsdb_file, end=datetime(2014, 1, 1), freq="IRR")
+        self.assertEqual(1, len(data))
+        self.assertEqual(1.0, data.values[0])
+
+    def test_read_window_out_of_range(self):
+        for freq in ["D", "IRR"]:
+            data = reader.read(
+                self.tsdb_file,
+                start=datetime(2015, 1, 1),
+                end=datetime(2015, 2, 1),
+                freq=freq,
+            )
+            self.assertEqual(0, len(data))
+
+            data = reader.read(
+                self.tsdb_file,
+                start=datetime(2013, 1, 1),
+                end=datetime(2013, 2, 1),
+                freq=freq,
+            )
+            self.assertEqual(0, len(data))
+
+    def test_read_mapped(self):
+        data = reader.read_mapped(self.tsdb_file_with_missing)
+
+        self.assertEqual(6, len(data))
+        self.assertIsInstance(data.records, np.memmap)
+        self.assertEqual(np.datetime64("2014-01-01"), data.dates[0])
+        self.assertEqual(2.0, data[1])
+        self.assertTrue(np.isnan(data[3]))
+        self.assertEqual([False, False, False, True, False, False], list(data.missing))
+
+        series = data.to_series()
+        expected = reader.read(self.tsdb_file_with_missing)
+        pd.testing.assert_series_equal(expected, series, check_freq=False)
+
+    def test_read_mapped_window(self):
+        data = reader.read_mapped(
+            self.tsdb_file_with_missing,
+            start=datetime(2014, 1, 3),
+            end=datetime(2014, 1, 5),
+            freq="D",
+        )
+
+        self.assertEqual(3, len(data))
+        self.assertEqual(3.0, data[0])
+        self.assertEqual(5.0, data[2])
+
+        data = data[1:]
+        self.assertEqual(2, len(data))
+        self.assertTrue(np.isnan(data[0]))
+
+    def test_read_mapped_empty(self):
+        self.assertEqual(0, len(reader.read_mapped(self.empty_tsdb_file)))
+        self.assertEqual(0, len(reader.read_mapped("/tmp/not_an_actual_existing_file")))
+        self.assertEqual(
+            0, len(reader.read_mapped(self.tsdb_file, start=datetime(2015, 1, 1)))
+        )
+
+    def test_read_resampled(self):
+        data = reader.read(self.tsdb_file_with_missing)
+
+        for how in reader.aggregates:
+            for chunk_records in [1, 4, 100]:
+                resampled = reader.read_resampled(
+                    self.tsdb_file_with_missing,
+                    "2D",
+                    how,
+                    freq="D",
+                    chunk_records=chunk_records,
+                )
+                pd.testing.assert_series_equal(
+                    data.resample("2D").agg(how),
+                    resampled,
+                    check_names=False,
+                    check_freq=False,
+                )
+
+        self.assertRaises(
+            ValueError, reader.read_resampled, self.tsdb_file, "D", "median"
+        )
+
+    def test_read_resampled_empty(self):
+        self.assertEqual(
+            0, len(reader.read_resampled(self.empty_tsdb_file, "M", "sum"))
+        )
+        self.assertEqual(
+            0,
+            len(reader.read_resampled("/tmp/not_an_actual_existing_file", "M", "sum")),
+        )
+
+    def test_iter_chunks(self):
+        for chunk_records in [1, 4, 100]:
+            chunks = list(
+                reader.iter_chunks(self.tsdb_file_with_missing, chunk_records)
+            )
+            self.assertEqual(min(chunk_records, 6), len(chunks[0]))
+            pd.testing.assert_series_equal(
+                reader.read(self.tsdb_file_with_missing),
+                pd.concat(chunks),
+                check_freq=False,
+            )
+
+        dates, values = next(
+            reader.iter_chunks(
+                self.tsdb_file_with_missing,
+                start=datetime(2014, 1, 3),
+                end=datetime(2014, 1, 5),
+                as_series=False,
+            )
+        )
+        self.assertEqual(np.datetime64("2014-01-03"), dates[0])
+        self.assertEqual(3.0, values[0])
+        self.assertTrue(np.isnan(values[1]))
+        self.assertEqual(5.0, values[2])
+
+    def test_iter_chunks_empty(self):
+        self.assertEqual([], list(reader.iter_chunks(self.empty_tsdb_file)))
+        self.assertEqual(
+            [], list(reader.iter_chunks("/tmp/not_an_actual_existing_file"))
+        )
+        self.assertRaises(
+            ValueError, list, reader.iter_chunks(self.tsdb_file, chunk_records=0)
+        )
+
+    def test_read_latest(self):
+        data = reader.read(self.tsdb_file_with_missing)
+
+        for n in [1, 3, 6, 10]:
+            pd.testing.assert_series_equal(
+                data.iloc[-n:],
+                reader.read_latest(self.tsdb_file_with_missing, n),
+                check_freq=False,
+            )
+
+        self.assertTrue(np.isnan(reader.read_latest(self.tsdb_file_with_missing, 3)[0]))
+        self.assertRaises(ValueError, reader.read_latest, self.tsdb_file, 0)
+
+    def test_read_latest_empty(self):
+        self.assertEqual(0, len(reader.read_latest(self.empty_tsdb_file)))
+        self.assertEqual(0, len(reader.read_latest("/tmp/not_an_actual_existing_file")))
@@ -0,0 +1,144 @@
+import numpy as np
+import os
+import pandas as pd
+import shutil
+import tempfile
+import unittest
+
+from phildb import chunked
+from phildb import reader
+from phildb import summary
+from phildb import writer
+
+
+class SummaryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.tsdb_file = os.path.join(self.tmp_dir, "test.tsdb")
+
+        rng = np.random.RandomState(0)
+        values = rng.randn(2000)
+        values[rng.rand(2000) < 0.1] = np.nan
+        self.series = pd.Series(
+            values, pd.date_range("2014-01-01", periods=2000, freq="H")
+        )
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(self.tmp_dir)
+        except OSError as e:
+            if e.errno != 2:  # Code 2: No such file or directory.
+                raise
+
+    def write_and_check(self, freq, writes):
+        writer.write(self.tsdb_file, writes[0], freq)
+        summary.update(self.tsdb_file, block_records=50)
+
+        for ts in writes[1:]:
+            writer.write(self.tsdb_file, ts, freq)
+
+        block_records, blocks = summary.read_blocks(
+            summary.summary_file(self.tsdb_file)
+        )
+        self.assertEqual(50, block_records)
+
+        summary.update(self.tsdb_file, block_records=50)
+        block_records, expected = summary.read_blocks(
+            summary.summary_file(self.tsdb_file)
+        )
+        self.assertEqual(expected.tobytes(), blocks.tobytes())
+
+    def test_summary_file(self):
+        writer.write(self.tsdb_file, self.series[:10], "H")
+
+        self.assertEqual(
+            os.path.join(self.tmp_dir, "test.summary"),
+            summary.summary_file(self.tsdb_file),
+        )
+
+        block_records, blocks = summary.read_blocks(
+            summary.summary_file(self.tsdb_file)
+        )
+        self.assertEqual(summary.default_block_records, block_records)
+        self.assertEqual(1, len(blocks))
+        self.assertEqual(10, blocks["count"][0])
+        self.assertEqual(self.series[:10].count(), blocks["valid"][0])
+        self.assertAlmostEqual(self.series[:10].sum(), blocks["sum"][0])
+        self.assertEqual(self.series[:10].min(), blocks["min"][0])
+        self.assertEqual(self.series[:10].max(), blocks["max"][0])
+
+    def test_update_regular(self):
+        self.write_and_check(
+            "H",
+            [
+                self.series[500:1000],
+                self.series[1200:],
+                self.series[700:750] * 2,
+                self.series[:600],
+            ],
+        )
+
+    def test_update_irregular(self):
+        self.write_and_check(
+            "IRR",
+            [self.series[::3], self.series[1::3][500:], self.series[::3][100:200] * 2],
+        )
+
+    def test_update_in_place(self):
+        self.write_and_check(
+            "H",
+            [
+                self.series[:1000],
+                self.series[10:20] * 2,
+                self.series[180:320] * 3,
+                self.series[990:1100],
+            ],
+        )
+
+    def test_update_irregular_append(self):
+        self.write_and_check(
+            "IRR",
+            [self.series[:1000:3], self.series[::3][100:200] * 2, self.series[1001::3]],
+        )
+
+    def test_update_chunked(self):
+        chunked.create(self.tsdb_file, chunk_records=64)
+
+        self.write_and_check(
+            "H", [self.series[500:1000], self.series[900:], self.series[:100]]
+        )
+
+    def test_aggregate(self):
+        writer.write(self.tsdb_file, self.series[:1000], "H")
+        writer.write(self.tsdb_file, self.series[1500:], "H")
+        summary.update(self.tsdb_file, block_records=50)
+
+        series = reader.read(self.tsdb_file)
+        for how in summary.aggregates:
+            for period in ["D", "W", "M"]:
+                for start, end in [(None, None), ("2014-01-10 05:00", "2014-02-20")]:
+                    pd.testing.assert_series_equal(
+                        series[start:end].resample(period, kind="period").agg(how),
+                        summary.aggregate(self.tsdb_file, how, period, start, end),
+                        check_names=False,
+                        check_freq=False,
+                    )
+
+    def test_aggregate_without_summary(self):
+        writer.write(self.tsdb_file, self.series, "H")
+        os.remove(summary.summary_file(self.tsdb_file))
+
+        result = summary.aggregate(self.tsdb_file, "max", "M")
+
+        pd.testing.assert_series_equal(
+            self.series.resample("M").max().to_period("M"), result, check_names=False
+        )
+        self.assertFalse(os.path.exists(summary.summary_file(self.tsdb_file)))
+
+    def test_aggregate_empty(self):
+        writer.write(self.tsdb_file, self.series, "H")
+
+        result = summary.aggregate(self.tsdb_file, "sum", "D", start="2015-01-01")
+
+        self.assertEqual(0, len(result))
+        self.assertRaises(ValueError, summary.aggregate, self.tsdb_file, "median", "D")
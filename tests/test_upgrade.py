@@ -0,0 +1,77 @@
+import gc
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from phildb import constants
+from phildb.create import create
+from phildb.database import PhilDB
+from phildb.exceptions import SchemaVersionError
+from phildb.upgrade import upgrade
+
+
+class UpgradeDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.tsdb_path = os.path.join(self.temp_dir, "tsdb")
+        create(self.tsdb_path)
+
+        self.meta_data_db = os.path.join(self.tsdb_path, constants.METADATA_DB)
+
+    def tearDown(self):
+        gc.collect()
+        try:
+            shutil.rmtree(self.temp_dir)
+        except OSError as e:
+            if e.errno != 2:  # Code 2: No such file or directory.
+                raise
+
+    def set_version(self, version):
+        conn = sqlite3.connect(self.meta_data_db)
+        conn.execute("UPDATE schema_version SET version = ?", (version,))
+        conn.commit()
+        conn.close()
+
+    def instance_indexes(self):
+        conn = sqlite3.connect(self.meta_data_db)
+        indexes = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' "
+            "AND tbl_name = 'timeseries_instance' AND sql IS NOT NULL"
+        ).fetchall()
+        conn.close()
+
+        return sorted(index[0] for index in indexes)
+
+    def test_upgrade_0_0_6(self):
+        conn = sqlite3.connect(self.meta_data_db)
+        for index in self.instance_indexes():
+            conn.execute("DROP INDEX {0}".format(index))
+        conn.commit()
+        conn.close()
+        self.set_version("0.0.6")
+
+        self.assertRaises(AssertionError, PhilDB, self.tsdb_path)
+
+        self.assertEqual("0.0.6", upgrade(self.tsdb_path))
+
+        self.assertEqual(
+            [
+                "ix_timeseries_instance_freq",
+                "ix_timeseries_instance_measurand_id",
+                "ix_timeseries_instance_source_id",
+                "ix_timeseries_instance_uuid",
+            ],
+            self.instance_indexes(),
+        )
+        self.assertEqual(constants.DB_VERSION, PhilDB(self.tsdb_path).version())
+
+    def test_upgrade_current(self):
+        self.assertEqual(constants.DB_VERSION, upgrade(self.tsdb_path))
+        self.assertEqual(4, len(self.instance_indexes()))
+
+    def test_upgrade_unknown_version(self):
+        self.set_version("0.0.1")
+
+        self.assertRaises(SchemaVersionError, upgrade, self.tsdb_path)
@@ -1,6 +1,7 @@
 import gc
 import os
 import hashlib
+import mock
 import numpy as np
 import pandas as pd
 import shutil
@@ -107,6 +108,26 @@ class WriterTest(unittest.TestCase):
         self.assertTrue(np.isnan(data.values[1]))
         self.assertEqual(3.0, data.values[2])
 
+    def test_new_write_log_entries(self):
+        log_entries = writer.write(
+            self.tsdb_file,
+            pd.Series(
+                index=[
+                    datetime(2014, 1, 1),
+                    datetime(2014, 1, 2),
+                    datetime(2014, 1, 3),
+                ],
+                data=[1.0, 2.0, 3.0],
+            ),
+            "D",
+        )
+
+        self.assertEqual(
+            [(1388534400, 1.0, 0), (1388620800, 2.0, 0), (1388707200, 3.0, 0)],
+            log_entries["C"].tolist(),
+        )
+        self.assertEqual([], log_entries["U"].tolist())
+
     def test_new_write_and_update_minute_data(self):
         writer.write(
             self.tsdb_file,
@@ -159,7 +180,7 @@ class WriterTest(unittest.TestCase):
             pd.Series(index=[datetime(2014, 1, 2)], data=[2.5]),
             "D",
         )
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual(1, len(modified))
         self.assertEqual([(1388620800, 2.0, 0)], modified)
 
@@ -174,7 +195,7 @@ class WriterTest(unittest.TestCase):
             ),
             "D",
         )
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual(2, len(modified))
         self.assertEqual((1388620800, 2.0, 0), modified[0])
         self.assertEqual((1388707200, 3.0, 0), modified[1])
@@ -183,13 +204,49 @@ class WriterTest(unittest.TestCase):
         self.assertEqual(2.5, data.values[1])
         self.assertEqual(3.5, data.values[2])
 
+    def test_update_separated_changes(self):
+        writer.write(
+            self.tsdb_file,
+            pd.Series(
+                np.arange(10, dtype=np.float64),
+                index=pd.date_range("2014-01-01", periods=10, freq="D"),
+            ),
+            "D",
+        )
+
+        update = pd.Series(
+            [1.0, 2.5, 3.5, 4.0, 5.0, 6.5, 7.0, np.nan, 10.0],
+            index=pd.date_range("2014-01-02", periods=9, freq="D"),
+        )
+        log_entries = writer.write(self.tsdb_file, update, "D")
+
+        self.assertEqual(
+            [
+                (1388707200, 2.0, 0),
+                (1388793600, 3.0, 0),
+                (1389052800, 6.0, 0),
+                (1389225600, 8.0, 0),
+                (1389312000, 9.0, 0),
+            ],
+            log_entries["U"].tolist(),
+        )
+        self.assertEqual(5, len(log_entries["C"]))
+
+        data = reader.read(self.tsdb_file)
+        self.assertEqual(10, len(data))
+        self.assertEqual(
+            [0.0, 1.0, 2.5, 3.5, 4.0, 5.0, 6.5, 7.0], list(data.values[:8])
+        )
+        self.assertTrue(np.isnan(data.values[8]))
+        self.assertEqual(10.0, data.values[9])
+
     def test_append_single(self):
         log_entries = writer.write(
             self.tsdb_existing_file,
             pd.Series(index=[datetime(2014, 1, 4)], data=[4.0]),
             "D",
         )
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual([], modified)
 
         data = reader.read(self.tsdb_existing_file)
@@ -208,7 +265,7 @@ class WriterTest(unittest.TestCase):
             ),
             "D",
         )
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual([], modified)
 
         data = reader.read(self.tsdb_existing_file)
@@ -225,9 +282,9 @@ class WriterTest(unittest.TestCase):
             pd.Series(index=[datetime(2013, 12, 31)], data=[-1.0]),
             "D",
         )
-        created = log_entries["C"]
+        created = log_entries["C"].tolist()
         self.assertEqual([(1388448000, -1.0, 0)], created)
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual([], modified)
 
         data = reader.read(self.tsdb_existing_file)
@@ -239,9 +296,9 @@ class WriterTest(unittest.TestCase):
             pd.Series(index=[datetime(2013, 12, 30)], data=[-2.0]),
             "D",
         )
-        created = log_entries["C"]
+        created = log_entries["C"].tolist()
         self.assertEqual([(1388361600, -2.0, 0), (1388448000, -9999, 9999)], created)
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual([], modified)
 
         data = reader.read(self.tsdb_existing_file)
@@ -261,12 +318,12 @@ class WriterTest(unittest.TestCase):
             ),
             "D",
         )
-        created = log_entries["C"]
+        created = log_entries["C"].tolist()
         self.assertEqual(
             [(1388361600, -2.0, 0), (1388448000, -1.0, 0), (1388534400, 0.0, 0)],
             created,
         )
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual([(1388534400, 1.0, 0)], modified)
 
         data = reader.read(self.tsdb_existing_file)
@@ -274,15 +331,51 @@ class WriterTest(unittest.TestCase):
         self.assertEqual(-1.0, data.values[1])
         self.assertEqual(0.0, data.values[2])
 
+    def test_prepend_large(self):
+        existing = pd.Series(
+            np.arange(100000, dtype=np.float64),
+            index=pd.date_range("2014-01-01", periods=100000, freq="T"),
+        )
+        writer.write(self.tsdb_file, existing, "T")
+
+        log_entries = writer.write(
+            self.tsdb_file,
+            pd.Series(index=[datetime(2013, 12, 31, 23, 58)], data=[-2.0]),
+            "T",
+        )
+        self.assertEqual(
+            [(1388534280, -2.0, 0), (1388534340, -9999, 9999)],
+            log_entries["C"].tolist(),
+        )
+
+        data = reader.read(self.tsdb_file)
+        self.assertEqual(100002, len(data))
+        self.assertEqual(-2.0, data.values[0])
+        self.assertTrue(np.isnan(data.values[1]))
+        np.testing.assert_array_equal(existing.values, data.values[2:])
+        self.assertFalse(os.path.exists(self.tsdb_file + ".tmp"))
+
+    @mock.patch("os.copy_file_range", side_effect=OSError(18, "EXDEV"), create=True)
+    def test_prepend_buffered_copy(self, copy_file_range):
+        log_entries = writer.write(
+            self.tsdb_existing_file,
+            pd.Series(index=[datetime(2013, 12, 31)], data=[-1.0]),
+            "D",
+        )
+
+        data = reader.read(self.tsdb_existing_file)
+        self.assertEqual([-1.0, 1.0, 2.0, 3.0], list(data.values))
+        self.assertFalse(os.path.exists(self.tsdb_existing_file + ".tmp"))
+
     def test_prepend_irregular(self):
         log_entries = writer.write(
             self.tsdb_existing_file,
             pd.Series(index=[datetime(2013, 12, 30)], data=[-1.0]),
             "IRR",
         )
-        created = log_entries["C"]
+        created = log_entries["C"].tolist()
         self.assertEqual([(1388361600, -1.0, 0)], created)
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual([], modified)
 
         data = reader.read(self.tsdb_existing_file)
@@ -304,7 +397,7 @@ class WriterTest(unittest.TestCase):
             ),
             "D",
         )
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
 
         self.assertEqual(1, len(modified))
         self.assertEqual((1388620800, 2.0, 0), modified[0])
@@ -331,7 +424,7 @@ class WriterTest(unittest.TestCase):
             ),
             "D",
         )
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
 
         data = reader.read(self.tsdb_existing_file)
         self.assertEqual(1.0, data.values[0])
@@ -355,7 +448,7 @@ class WriterTest(unittest.TestCase):
             ),
             "D",
         )
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
 
         self.assertEqual(2, len(modified))
         self.assertEqual((1388620800, 2.0, 0), modified[0])
@@ -379,7 +472,7 @@ class WriterTest(unittest.TestCase):
             ),
             "D",
         )
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
 
         self.assertEqual(0, len(modified))
 
@@ -400,7 +493,7 @@ class WriterTest(unittest.TestCase):
             ),
             "D",
         )
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
 
         self.assertEqual(0, len(modified))
 
@@ -421,7 +514,7 @@ class WriterTest(unittest.TestCase):
             ),
             "D",
         )
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
 
         self.assertEqual(0, len(modified))
 
@@ -454,7 +547,7 @@ class WriterTest(unittest.TestCase):
 
         writer.write(self.tsdb_file, input_a, "H")
         log_entries = writer.write(self.tsdb_file, input_b, "H")
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual(1, len(modified))
         self.assertEqual([(1388541600, 3.0, 0)], modified)
 
@@ -473,7 +566,7 @@ class WriterTest(unittest.TestCase):
         )
 
         log_entries = writer.write(self.tsdb_30min_existing_file, new_data, "30min")
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual(0, len(modified))
 
         data = reader.read(self.tsdb_30min_existing_file)
@@ -496,7 +589,7 @@ class WriterTest(unittest.TestCase):
         )
 
         log_entries = writer.write(self.tsdb_file, new_data, "M")
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual(0, len(modified))
 
         data = reader.read(self.tsdb_file)
@@ -519,7 +612,7 @@ class WriterTest(unittest.TestCase):
         )
 
         log_entries = writer.write(self.tsdb_file, new_data, "MS")
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual(0, len(modified))
 
         data = reader.read(self.tsdb_file)
@@ -536,7 +629,7 @@ class WriterTest(unittest.TestCase):
         )
 
         log_entries = writer.write(self.tsdb_monthly_existing_file, new_data, "M")
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual(0, len(modified))
 
         data = reader.read(self.tsdb_monthly_existing_file)
@@ -553,7 +646,7 @@ class WriterTest(unittest.TestCase):
         log_entries = writer.write(
             self.tsdb_monthly_start_existing_file, new_data, "MS"
         )
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual(0, len(modified))
 
         data = reader.read(self.tsdb_monthly_start_existing_file)
@@ -575,7 +668,7 @@ class WriterTest(unittest.TestCase):
         )
 
         log_entries = writer.write(self.tsdb_file, new_data, "IRR")
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual(0, len(modified))
 
         data = reader.read(self.tsdb_file)
@@ -606,8 +699,8 @@ class WriterTest(unittest.TestCase):
             ),
             "IRR",
         )
-        created = log_entries["C"]
-        modified = log_entries["U"]
+        created = log_entries["C"].tolist()
+        modified = log_entries["U"].tolist()
 
         self.assertEqual(0, len(modified))
         self.assertEqual(3, len(created))
@@ -635,8 +728,8 @@ class WriterTest(unittest.TestCase):
             ),
             "IRR",
         )
-        created = log_entries["C"]
-        modified = log_entries["U"]
+        created = log_entries["C"].tolist()
+        modified = log_entries["U"].tolist()
 
         self.assertEqual(1, len(modified))
         self.assertEqual(4, len(created))
@@ -657,6 +750,38 @@ class WriterTest(unittest.TestCase):
         self.assertEqual(datetime(2014, 1, 7), data.index[4].to_pydatetime())
         self.assertEqual(datetime(2014, 1, 8), data.index[5].to_pydatetime())
 
+    def test_irregular_insert(self):
+        log_entries = writer.write(
+            self.tsdb_existing_file,
+            pd.Series(
+                index=[datetime(2014, 1, 1, 12), datetime(2014, 1, 3)], data=[1.5, 3.5]
+            ),
+            "IRR",
+        )
+
+        self.assertEqual(
+            [(1388707200, 3.5, 0), (1388577600, 1.5, 0)], log_entries["C"].tolist()
+        )
+        self.assertEqual([(1388707200, 3.0, 0)], log_entries["U"].tolist())
+
+        data = reader.read(self.tsdb_existing_file)
+        self.assertEqual([1.0, 1.5, 2.0, 3.5], list(data.values))
+        self.assertEqual(datetime(2014, 1, 1, 12), data.index[1].to_pydatetime())
+        self.assertEqual(datetime(2014, 1, 3), data.index[3].to_pydatetime())
+
+    def test_irregular_write_empty_file(self):
+        open(self.tsdb_file, "wb").close()
+
+        log_entries = writer.write(
+            self.tsdb_file,
+            pd.Series(index=[datetime(2014, 1, 1), datetime(2014, 1, 3)], data=[1, 3]),
+            "IRR",
+        )
+        self.assertEqual(2, len(log_entries["C"]))
+
+        data = reader.read(self.tsdb_file)
+        self.assertEqual([1.0, 3.0], list(data.values))
+
     def test_irregular_update_nan(self):
         log_entries = writer.write(
             self.tsdb_existing_file,
@@ -672,7 +797,7 @@ class WriterTest(unittest.TestCase):
             ),
             "IRR",
         )
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
 
         self.assertEqual(1, len(modified))
         self.assertEqual((1388707200, 3.0, 0), modified[0])
@@ -721,7 +846,7 @@ class WriterTest(unittest.TestCase):
             ),
             "IRR",
         )
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
 
         self.assertEqual(1, len(modified))
         self.assertEqual(1388707200, modified[0][0])
@@ -756,7 +881,7 @@ class WriterTest(unittest.TestCase):
         updated_data = reader.read(self.tsdb_existing_file)
         self.assertEqual(4.0, updated_data.values[3])
 
-        modified = log_entries["U"]
+        modified = log_entries["U"].tolist()
         self.assertEqual(1, len(modified))
 
     def test_log_entries_for_update_nan_multiple_times(self):
@@ -767,7 +892,7 @@ class WriterTest(unittest.TestCase):
             ),
             "D",
         )
-        new_entries = log_entries["C"]
+        new_entries = log_entries["C"].tolist()
         self.assertEqual(2, len(new_entries))
 
         log_entries = writer.write(
@@ -777,7 +902,7 @@ class WriterTest(unittest.TestCase):
             ),
             "D",
         )
-        new_entries = log_entries["C"]
+        new_entries = log_entries["C"].tolist()
         self.assertEqual(1, len(new_entries))
 
     def test_empty_series_write(self):
@@ -817,7 +942,7 @@ class WriterTest(unittest.TestCase):
             ),
             "D",
         )
-        new_entries = log_entries["C"]
+        new_entries = log_entries["C"].tolist()
 
         updated_data = reader.read(self.tsdb_existing_file)
         self.assertEqual(1.5, updated_data.values[0])
@@ -831,7 +956,7 @@ class WriterTest(unittest.TestCase):
             ),
             "IRR",
         )
-        new_entries = log_entries["C"]
+        new_entries = log_entries["C"].tolist()
 
         updated_data = reader.read(self.tsdb_existing_file)
         self.assertEqual(1.5, updated_data.values[0])